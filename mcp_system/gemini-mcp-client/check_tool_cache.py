@@ -0,0 +1,80 @@
+"""
+check_tool_cache.py
+
+End-to-end check of the tool result cache against the local dummy MCP server (dummy_server.py).
+
+  1. A repeated call of a cached tool is served from the cache: the hit count goes up and the
+     server's execution count does not.
+  2. With a persistence path, the cached result survives a restart of both the server and the cache.
+
+Usage:
+    python check_tool_cache.py        # exits non-zero if a check fails
+"""
+
+import asyncio                        # For asynchronous operations
+import os                             # For file paths
+import sys                            # For the interpreter path and the exit code
+import tempfile                       # For an isolated cache persistence file
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from langchain_mcp_adapters.tools import load_mcp_tools
+from tool_cache import ToolResultCache
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dummy_server.py")
+
+
+def as_int(content):
+    """Converts a tool result (text, or a list of text blocks) to an int."""
+    if isinstance(content, list):
+        content = "".join(block.get("text", "") if isinstance(block, dict) else str(block) for block in content)
+    return int(str(content).strip())
+
+
+async def run_session(cache, calls):
+    """
+    Starts a fresh dummy server, calls square once per value in `calls` through the cache and
+    returns the results plus the number of times the server actually executed square.
+    """
+    server_params = StdioServerParameters(command=sys.executable, args=[SERVER_SCRIPT])
+    async with stdio_client(server_params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            tools = {tool.name: tool for tool in cache.wrap_tools(await load_mcp_tools(session))}
+            results = [as_int(await tools["square"].ainvoke({"x": x})) for x in calls]
+            executed = as_int(await tools["call_count"].ainvoke({}))
+    return results, executed
+
+
+def check(condition, message):
+    print(f"{'✅' if condition else '❌'} {message}")
+    return condition
+
+
+async def main():
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = {"toolCache": {"allow": ["square"], "path": os.path.join(tmp_dir, "tool_cache.pkl")}}
+
+        # 1. Repeated call within one run
+        cache = ToolResultCache.from_config(config)
+        results, executed = await run_session(cache, [7, 7])
+        ok &= check(results == [49, 49], f"square(7) returned {results}")
+        ok &= check(executed == 1, f"server executed square {executed} time(s) for 2 calls (expected 1)")
+        ok &= check(cache.stats["square"] == {"hits": 1, "misses": 1}, f"cache stats {cache.stats['square']}")
+        ok &= check("call_count" not in cache.stats, "tools outside the allow-list are not cached")
+        cache.save()
+
+        # 2. Restart: new server process and a cache loaded from the persistence file
+        cache = ToolResultCache.from_config(config)
+        results, executed = await run_session(cache, [7])
+        ok &= check(results == [49], f"square(7) after restart returned {results}")
+        ok &= check(executed == 0, f"server executed square {executed} time(s) after restart (expected 0)")
+        ok &= check(cache.stats["square"] == {"hits": 1, "misses": 0}, f"cache stats after restart {cache.stats['square']}")
+
+    print(cache.report())
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(main()) else 1)
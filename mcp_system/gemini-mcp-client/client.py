@@ -4,21 +4,34 @@ langchain_mcp_client_wconfig.py
 
 This file implements a LangChain MCP client that:
   - Loads configuration from a JSON file specified by the THEAILANGUAGE_CONFIG environment variable.
-  - Connects to one or more MCP servers defined in the config.
+  - Connects to one or more MCP servers defined in the config concurrently, with per-server timeouts.
   - Loads available MCP tools from each connected server.
   - Uses the Google Gemini API (via LangChain) to create a React agent with access to all tools.
-  - Runs an interactive chat loop where user queries are processed by the agent.
+  - Runs an interactive chat loop where user queries are processed by the agent, or, with --batch,
+    answers all queries from a JSONL file concurrently and streams compact JSONL results.
 
 Detailed explanations:
   - Retries (max_retries=2): If an API call fails due to transient issues (e.g., timeouts), it will retry up to 2 times.
+  - Timeout (LLM_TIMEOUT_S, default 20s, same as the RAG agent): A single Gemini API call is abandoned after this many seconds.
   - Temperature (set to 0): A value of 0 means fully deterministic output; increase this for more creative responses.
   - Environment Variable: THEAILANGUAGE_CONFIG should point to a config JSON that defines all MCP servers.
+  - Tool result cache: an optional "toolCache" section in the config enables caching of deterministic tools
+    (see tool_cache.py). Hit ratios are printed when the client exits.
+  - Startup timeouts: each server may set "connect_timeout" and "init_timeout" (seconds) in the config;
+    otherwise MCP_CONNECT_TIMEOUT / MCP_INIT_TIMEOUT (default 15s / 30s) apply. Servers that fail or time
+    out are skipped and the agent starts with the tools of the servers that came up.
+  - Batch mode: `python client.py [config.json] --batch queries.jsonl [--output results.jsonl] [--concurrency 8]`
+    Each input line is a JSON object with a "query" (or "body" / "title") field, or a plain JSON string.
+    Each output line holds the query id, answer, tool call count, latency and error (if any), written as
+    soon as the query finishes.
 """
 
+import argparse                       # For parsing command line arguments
 import asyncio                        # For asynchronous operations
 import os                             # To access environment variables and file paths
 import sys                            # For system-specific parameters and error handling
 import json                           # For reading and writing JSON data
+import time                           # For measuring server startup times
 from contextlib import AsyncExitStack # For managing multiple asynchronous context managers
 
 # ---------------------------
@@ -33,6 +46,7 @@ from mcp.client.stdio import stdio_client             # For establishing a stdio
 from langchain_mcp_adapters.tools import load_mcp_tools  # Adapter to convert MCP tools to LangChain compatible tools
 from langgraph.prebuilt import create_react_agent        # Function to create a prebuilt React agent using LangGraph
 from langchain_google_genai import ChatGoogleGenerativeAI  # Wrapper for the Google Gemini API via LangChain
+from tool_cache import ToolResultCache                   # Result cache for deterministic MCP tool calls
 
 # ---------------------------
 # Environment Setup
@@ -59,23 +73,22 @@ class CustomEncoder(json.JSONEncoder):
 # ---------------------------
 # Function: read_config_json
 # ---------------------------
-def read_config_json():
+def read_config_json(config_path=None):
     """
     Reads the MCP server configuration JSON.
 
     Priority:
-      1. Try to read the path from the THEAILANGUAGE_CONFIG environment variable.
-      2. If not set, fallback to a default file 'theailanguage_config.json' in the same directory.
+      1. Use the path passed on the command line, if any.
+      2. Try to read the path from the THEAILANGUAGE_CONFIG environment variable.
+      3. If not set, fallback to a default file 'theailanguage_config.json' in the same directory.
 
     Returns:
         dict: Parsed JSON content with MCP server definitions.
     """
     # Attempt to get the config file path from the environment variable
-    config_path = os.getenv("THEAILANGUAGE_CONFIG")
+    if not config_path:
+        config_path = os.getenv("THEAILANGUAGE_CONFIG")
 
-    if len(sys.argv) > 1:
-        config_path = sys.argv[1]
-        
     if not config_path:
         # If environment variable is not set, use a default config file in the same directory as this script
         script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -98,66 +111,244 @@ llm = ChatGoogleGenerativeAI(
     model="gemini-2.0-flash",             # Specify the Google Gemini model variant to use
     temperature=0,                            # Set temperature to 0 for deterministic responses
     max_retries=2,                            # Set maximum retries for API calls to 2 in case of transient errors
+    timeout=float(os.getenv("LLM_TIMEOUT_S", "20")),  # Give up on a single API call after this many seconds
     google_api_key=os.getenv("GOOGLE_API_KEY")  # Retrieve the Google API key from environment variables
 )
 
+# ---------------------------
+# Server Startup Timeouts
+# ---------------------------
+# Defaults (in seconds) used when a server entry in the config does not define its own
+# "connect_timeout" / "init_timeout" keys.
+DEFAULT_CONNECT_TIMEOUT = float(os.getenv("MCP_CONNECT_TIMEOUT", "15"))
+DEFAULT_INIT_TIMEOUT = float(os.getenv("MCP_INIT_TIMEOUT", "30"))
+
+# ---------------------------
+# Function: serve_mcp_server
+# ---------------------------
+async def serve_mcp_server(server_info, ready, shutdown):
+    """
+    Brings up a single MCP server and keeps its session open until shutdown is signalled.
+
+    Each server lives in its own task because the stdio transport's context managers must be
+    entered and exited from the same task. Once the tools are loaded, the result is reported
+    through the `ready` future so the caller can continue without waiting for slower servers.
+
+    Args:
+        server_info (dict): Server definition with "command", "args" and optional timeouts.
+        ready (asyncio.Future): Resolved with (tools, timings) or failed with the startup error.
+        shutdown (asyncio.Event): Set by the caller when the session should be closed.
+    """
+    connect_timeout = float(server_info.get("connect_timeout", DEFAULT_CONNECT_TIMEOUT))
+    init_timeout = float(server_info.get("init_timeout", DEFAULT_INIT_TIMEOUT))
+    timings = {}
+    phase = "connect"
+
+    # Create StdioServerParameters using the command and arguments specified for the server
+    server_params = StdioServerParameters(
+        command=server_info["command"],
+        args=server_info["args"]
+    )
+
+    try:
+        async with AsyncExitStack() as stack:
+            # Establish a stdio connection to the server (spawns the server process)
+            start = time.perf_counter()
+            async with asyncio.timeout(connect_timeout):
+                read, write = await stack.enter_async_context(stdio_client(server_params))
+                # Create a client session using the read and write streams from the connection
+                session = await stack.enter_async_context(ClientSession(read, write))
+            timings["connect"] = time.perf_counter() - start
+
+            # Initialize the session (handshake) and load the MCP tools using the adapter function
+            phase = "initialize"
+            start = time.perf_counter()
+            async with asyncio.timeout(init_timeout):
+                await session.initialize()
+                timings["initialize"] = time.perf_counter() - start
+
+                phase = "load tools"
+                start = time.perf_counter()
+                server_tools = await load_mcp_tools(session)
+                timings["load_tools"] = time.perf_counter() - start
+
+            ready.set_result((server_tools, timings))
+
+            # Keep the session alive until the agent is done
+            await shutdown.wait()
+    except TimeoutError:
+        limit = connect_timeout if phase == "connect" else init_timeout
+        if not ready.done():
+            ready.set_exception(TimeoutError(f"{phase} timed out after {limit:.0f}s"))
+    except Exception as e:
+        if not ready.done():
+            ready.set_exception(e)
+    finally:
+        # Never leave the caller waiting on a server that went away during startup
+        if not ready.done():
+            ready.set_exception(RuntimeError("server exited during startup"))
+
+# ---------------------------
+# Batch Mode
+# ---------------------------
+def read_batch_queries(path):
+    """
+    Reads queries from a JSONL file.
+
+    Each line is either a JSON string or an object with a "query" field (falling back to "body", then "title",
+    so backlog files such as requests.jsonl can be used as is). The id is taken from "id" / "request_id", or
+    the line number.
+
+    Returns:
+        list[tuple[str, str]]: (query id, query text) pairs in file order.
+    """
+    queries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"⚠️  Skipping line {line_number}: invalid JSON ({e})")
+                continue
+            if isinstance(record, str):
+                queries.append((str(line_number), record))
+                continue
+            if not isinstance(record, dict):
+                print(f"⚠️  Skipping line {line_number}: expected a JSON object or string")
+                continue
+            text = record.get("query") or record.get("body") or record.get("title")
+            if not text:
+                print(f"⚠️  Skipping line {line_number}: no query text")
+                continue
+            query_id = record.get("id") or record.get("request_id") or line_number
+            queries.append((str(query_id), text))
+    return queries
+
+async def run_batch_query(agent, semaphore, query_id, query, timeout):
+    """
+    Runs a single batch query once a concurrency slot is free.
+
+    Returns:
+        dict: Compact result record with the final answer, tool call count and latency in seconds.
+    """
+    async with semaphore:
+        start = time.perf_counter()
+        record = {"id": query_id, "query": query}
+        try:
+            async with asyncio.timeout(timeout):
+                response = await agent.ainvoke({"messages": query})
+            messages = response.get("messages", [])
+            record["answer"] = messages[-1].content if messages else None
+            record["tool_calls"] = sum(len(getattr(m, "tool_calls", None) or []) for m in messages)
+        except TimeoutError:
+            record["error"] = f"timed out after {timeout:.0f}s"
+        except Exception as e:
+            record["error"] = f"{e.__class__.__name__}: {e}"
+        record["latency_s"] = round(time.perf_counter() - start, 3)
+        return record
+
+async def run_batch(agent, input_path, output_path, concurrency, timeout):
+    """
+    Answers all queries from input_path with at most `concurrency` agent invocations in flight and
+    streams one compact JSON line per query to output_path in completion order.
+    """
+    queries = read_batch_queries(input_path)
+    print(f"\n📦 Running {len(queries)} queries from {input_path} (concurrency {concurrency})...")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    pending = [
+        asyncio.create_task(run_batch_query(agent, semaphore, query_id, query, timeout))
+        for query_id, query in queries
+    ]
+
+    start = time.perf_counter()
+    failed = 0
+    with open(output_path, "w", encoding="utf-8") as out:
+        for done in asyncio.as_completed(pending):
+            record = await done
+            failed += "error" in record
+            out.write(json.dumps(record, separators=(",", ":"), ensure_ascii=False, cls=CustomEncoder) + "\n")
+            out.flush()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ {len(queries) - failed}/{len(queries)} queries answered in {elapsed:.1f}s. Results: {output_path}")
+
 # ---------------------------
 # Main Function: run_agent
 # ---------------------------
-async def run_agent():
+async def run_agent(args):
     """
-    Connects to all MCP servers defined in the configuration, loads their tools, creates a unified React agent,
-    and starts an interactive loop to query the agent.
+    Connects to all MCP servers defined in the configuration concurrently, loads their tools, creates a
+    unified React agent from whichever servers came up, and either starts an interactive loop to query
+    the agent or runs a batch of queries.
     """
-    config = read_config_json()  # Load MCP server configuration from the JSON file
+    config = read_config_json(args.config)  # Load MCP server configuration from the JSON file
     mcp_servers = config.get("mcpServers", {})  # Retrieve the MCP server definitions from the config
     if not mcp_servers:
         print("❌ No MCP servers found in the configuration.")
         return
 
     tools = []  # Initialize an empty list to hold all the tools from the connected servers
+    tool_cache = ToolResultCache.from_config(config)  # None unless the config has a "toolCache" section
 
-    # Use AsyncExitStack to manage and cleanly close multiple asynchronous resources
-    async with AsyncExitStack() as stack:
-        # Iterate over each MCP server defined in the configuration
-        for server_name, server_info in mcp_servers.items():
-            print(f"\n🔗 Connecting to MCP Server: {server_name}...")
+    loop = asyncio.get_running_loop()
+    shutdown = asyncio.Event()
+    ready = {name: loop.create_future() for name in mcp_servers}
 
-            # Create StdioServerParameters using the command and arguments specified for the server
-            server_params = StdioServerParameters(
-                command=server_info["command"],
-                args=server_info["args"]
-            )
+    # Start every server at once; a slow or hung server only delays itself
+    startup = time.perf_counter()
+    server_tasks = []
+    for server_name, server_info in mcp_servers.items():
+        print(f"\n🔗 Connecting to MCP Server: {server_name}...")
+        server_tasks.append(asyncio.create_task(
+            serve_mcp_server(server_info, ready[server_name], shutdown)
+        ))
 
-            try:
-                # Establish a stdio connection to the server using the server parameters
-                read, write = await stack.enter_async_context(stdio_client(server_params))
-                # Create a client session using the read and write streams from the connection
-                session = await stack.enter_async_context(ClientSession(read, write))
-                # Initialize the session (e.g., perform handshake or setup operations)
-                await session.initialize()
+    try:
+        # Wait for every server to either come up or fail (each one is bounded by its own timeouts)
+        results = await asyncio.gather(*ready.values(), return_exceptions=True)
 
-                # Load the MCP tools from the connected server using the adapter function
-                server_tools = await load_mcp_tools(session)
+        for server_name, result in zip(ready, results):
+            if isinstance(result, BaseException):
+                # Handle any errors that occur during connection or tool loading for the server
+                print(f"❌ Failed to connect to server {server_name}: {result}")
+                continue
 
-                # Iterate over each tool and add it to the aggregated tools list
-                for tool in server_tools:
-                    print(f"\n🔧 Loaded tool: {tool.name}")
-                    tools.append(tool)
+            server_tools, timings = result
+            # Iterate over each tool and add it to the aggregated tools list
+            for tool in server_tools:
+                print(f"\n🔧 Loaded tool: {tool.name}")
+                tools.append(tool)
 
-                print(f"\n✅ {len(server_tools)} tools loaded from {server_name}.")
-            except Exception as e:
-                # Handle any errors that occur during connection or tool loading for the server
-                print(f"❌ Failed to connect to server {server_name}: {e}")
+            print(f"\n✅ {len(server_tools)} tools loaded from {server_name}.")
+            print(
+                f"⏱️  {server_name}: connect {timings['connect']:.2f}s, "
+                f"initialize {timings['initialize']:.2f}s, load tools {timings['load_tools']:.2f}s"
+            )
+
+        started = sum(1 for result in results if not isinstance(result, BaseException))
+        print(f"\n⏱️  {started}/{len(mcp_servers)} servers ready in {time.perf_counter() - startup:.2f}s")
 
         # If no tools were loaded from any server, exit the function
         if not tools:
             print("❌ No tools loaded from any server. Exiting.")
             return
 
+        # Serve repeated calls of allow-listed tools from the cache instead of the MCP server
+        if tool_cache:
+            tools = tool_cache.wrap_tools(tools)
+
         # Create a React agent using the Google Gemini LLM and the list of aggregated tools
         agent = create_react_agent(llm, tools)
 
+        if args.batch:
+            output_path = args.output or f"{os.path.splitext(args.batch)[0]}.results.jsonl"
+            await run_batch(agent, args.batch, output_path, args.concurrency, args.timeout)
+            return
+
         # Start the interactive chat loop
         print("\n🚀 MCP Client Ready! Type 'quit' to exit.")
         while True:
@@ -178,10 +369,32 @@ async def run_agent():
             except Exception:
                 # If JSON formatting fails, simply print the raw response
                 print(str(response))
+    finally:
+        if tool_cache:
+            print(tool_cache.report())
+            tool_cache.save()
+
+        # Close all server sessions from the tasks that opened them
+        shutdown.set()
+        await asyncio.gather(*server_tasks, return_exceptions=True)
 
 # ---------------------------
 # Entry Point
 # ---------------------------
+def positive_int(value):
+    """argparse type for integers >= 1 (a zero-sized semaphore would hang the batch forever)."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gemini MCP client")
+    parser.add_argument("config", nargs="?", help="MCP server config JSON (default: $THEAILANGUAGE_CONFIG)")
+    parser.add_argument("--batch", metavar="QUERIES_JSONL", help="answer all queries in a JSONL file and exit")
+    parser.add_argument("--output", metavar="RESULTS_JSONL", help="batch results file (default: <batch>.results.jsonl)")
+    parser.add_argument("--concurrency", type=positive_int, default=8, help="max queries in flight in batch mode (default: 8)")
+    parser.add_argument("--timeout", type=float, default=300, help="per-query timeout in seconds in batch mode (default: 300)")
+
     # Run the asynchronous run_agent function using asyncio's event loop
-    asyncio.run(run_agent())
\ No newline at end of file
+    asyncio.run(run_agent(parser.parse_args()))
\ No newline at end of file
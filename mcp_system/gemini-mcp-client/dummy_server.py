@@ -0,0 +1,35 @@
+"""
+dummy_server.py
+
+Minimal local MCP server for exercising the client without the bioinformatics servers.
+
+Tools:
+  - square: deterministic, counts how often it was actually executed (cache it via "toolCache").
+  - call_count: returns how many times square ran in this server process (never cache it).
+
+Used by check_tool_cache.py and dummy_config.json.
+"""
+
+from mcp.server.fastmcp import FastMCP
+
+mcp = FastMCP("dummy")
+
+_square_calls = 0
+
+
+@mcp.tool()
+def square(x: int) -> int:
+    """Returns x squared."""
+    global _square_calls
+    _square_calls += 1
+    return x * x
+
+
+@mcp.tool()
+def call_count() -> int:
+    """Returns how many times square has been executed by this server process."""
+    return _square_calls
+
+
+if __name__ == "__main__":
+    mcp.run()
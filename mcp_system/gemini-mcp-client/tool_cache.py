@@ -0,0 +1,203 @@
+"""
+tool_cache.py
+
+Result caching for deterministic MCP tool calls.
+
+The React agent frequently calls the same MCP tool (e.g. a structure or sequence lookup) with identical
+arguments across turns and queries. Every call is a full stdio round trip to the server, so results of
+tools that are known to be deterministic are cached here and served locally.
+
+Detailed explanations:
+  - Opt-in: only tools matching the allow-list (fnmatch patterns, e.g. "get_*") are cached.
+  - Keys: tool name + the call arguments canonicalized as sorted, compact JSON.
+  - TTLs: per-tool TTLs (seconds) with a default; expired entries are dropped on access.
+  - Memory cap: entries are sized by their pickled length and evicted least-recently-used first.
+  - Persistence (optional): the cache is loaded from and saved to a pickle file, so results survive restarts.
+  - Errors raised by a tool are never cached.
+
+Configured from the "toolCache" section of the client config JSON, for example:
+    "toolCache": {
+        "allow": ["fetch_pdb_*", "get_sequence"],
+        "ttl": {"get_sequence": 86400},
+        "default_ttl": 3600,
+        "max_bytes": 67108864,
+        "path": "tool_cache.pkl"
+    }
+
+Local check against the dummy server (dummy_server.py), run from this directory:
+    python check_tool_cache.py          # repeated calls and persistence across a restart
+    python client.py dummy_config.json  # interactive, with "square" cached
+"""
+
+import fnmatch                        # For matching tool names against the allow-list
+import hashlib                        # For hashing canonicalized arguments into cache keys
+import json                           # For canonicalizing tool arguments
+import os                             # For atomic replacement of the persisted cache file
+import pickle                         # For sizing and persisting cached results
+import time                           # For TTL bookkeeping
+from collections import OrderedDict   # For LRU ordering of cache entries
+
+# Sentinel returned by ToolResultCache.get on a miss (cached results may legitimately be None)
+MISS = object()
+
+
+class ToolResultCache:
+    """
+    LRU + TTL cache for MCP tool results, with hit/miss statistics per tool.
+    """
+
+    def __init__(self, allow=None, ttl=None, default_ttl=3600, max_bytes=64 * 1024 * 1024, path=None):
+        """
+        Args:
+            allow (list[str]): fnmatch patterns of tool names whose results may be cached.
+            ttl (dict[str, float]): Per-tool TTL in seconds (overrides default_ttl).
+            default_ttl (float): TTL in seconds for allowed tools without an explicit TTL.
+            max_bytes (int): Upper bound on the total pickled size of cached results.
+            path (str): Optional file used to persist the cache between runs.
+        """
+        self.allow = list(allow or [])
+        self.ttl = dict(ttl or {})
+        self.default_ttl = float(default_ttl)
+        self.max_bytes = int(max_bytes)
+        self.path = path
+
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._size = 0
+        self.stats = {}  # tool name -> {"hits": int, "misses": int}
+
+        if self.path:
+            self._load()
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Builds a cache from the "toolCache" section of the client config (None if the section is absent).
+        """
+        section = config.get("toolCache")
+        if not section:
+            return None
+        return cls(
+            allow=section.get("allow"),
+            ttl=section.get("ttl"),
+            default_ttl=section.get("default_ttl", 3600),
+            max_bytes=section.get("max_bytes", 64 * 1024 * 1024),
+            path=section.get("path"),
+        )
+
+    # ---------------------------
+    # Cache primitives
+    # ---------------------------
+    def is_cacheable(self, tool_name):
+        """Returns True if results of the given tool may be cached."""
+        return any(fnmatch.fnmatchcase(tool_name, pattern) for pattern in self.allow)
+
+    @staticmethod
+    def make_key(tool_name, arguments):
+        """Returns a stable key for a tool call, independent of argument order and formatting."""
+        canonical = json.dumps(arguments, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+        return f"{tool_name}:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()}"
+
+    def get(self, tool_name, key):
+        """Returns the cached result for key, or MISS. Updates the hit/miss statistics."""
+        stats = self.stats.setdefault(tool_name, {"hits": 0, "misses": 0})
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] < time.time():
+            self._evict(key)
+            entry = None
+        if entry is None:
+            stats["misses"] += 1
+            return MISS
+
+        stats["hits"] += 1
+        self._entries.move_to_end(key)
+        return entry[2]
+
+    def put(self, tool_name, key, value):
+        """Stores a result; silently skips values that cannot be pickled or exceed the memory cap."""
+        try:
+            size = len(pickle.dumps(value))
+        except Exception:
+            return
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._evict(key)
+        expires_at = time.time() + float(self.ttl.get(tool_name, self.default_ttl))
+        self._entries[key] = (expires_at, size, value)
+        self._size += size
+
+        # Evict least-recently-used entries until we are back under the cap
+        while self._size > self.max_bytes:
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._size -= size
+
+    # ---------------------------
+    # LangChain tool wrapping
+    # ---------------------------
+    def wrap_tools(self, tools):
+        """
+        Returns the tools with every allowed tool replaced by a caching copy. Other tools are returned unchanged.
+        """
+        return [self._wrap_tool(tool) if self.is_cacheable(tool.name) else tool for tool in tools]
+
+    def _wrap_tool(self, tool):
+        call_tool = tool.coroutine
+
+        async def cached_call_tool(**arguments):
+            key = self.make_key(tool.name, arguments)
+            result = self.get(tool.name, key)
+            if result is MISS:
+                result = await call_tool(**arguments)
+                self.put(tool.name, key, result)
+            return result
+
+        return tool.model_copy(update={"coroutine": cached_call_tool})
+
+    # ---------------------------
+    # Reporting and persistence
+    # ---------------------------
+    def report(self):
+        """Returns a short, human-readable summary of the hit ratios."""
+        lines = []
+        total_hits = total_calls = 0
+        for tool_name, stats in sorted(self.stats.items()):
+            calls = stats["hits"] + stats["misses"]
+            total_hits += stats["hits"]
+            total_calls += calls
+            lines.append(f"  - {tool_name}: {stats['hits']}/{calls} hits ({stats['hits'] / calls:.0%})")
+        ratio = total_hits / total_calls if total_calls else 0.0
+        header = (f"🗃️  Tool cache: {total_hits}/{total_calls} hits ({ratio:.0%}), "
+                  f"{len(self._entries)} entries, {self._size / 1024:.1f} KiB")
+        return "\n".join([header] + lines)
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as f:
+                entries = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"⚠️  Ignoring unreadable tool cache at '{self.path}': {e}")
+            return
+
+        now = time.time()
+        for key, (expires_at, size, value) in entries.items():
+            if expires_at >= now and self._size + size <= self.max_bytes:
+                self._entries[key] = (expires_at, size, value)
+                self._size += size
+
+    def save(self):
+        """Writes the cache to its persistence file (no-op without a path)."""
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(dict(self._entries), f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"⚠️  Failed to save tool cache to '{self.path}': {e}")
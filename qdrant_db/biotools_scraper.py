@@ -18,6 +18,8 @@ import json
 from typing import List, Dict, Optional
 from dataclasses import dataclass
 
+from catalog import index_path, write_catalog
+
 
 @dataclass
 class BioinformaticsTool:
@@ -269,12 +271,11 @@ def main():
     print("\n📝 Sample Qdrant entry:")
     print(json.dumps(qdrant_data[0], indent=2))
     
-    # Save to JSON file for later use
-    output_file = "biotools_python_tools.json"
+    # Save to the compact JSONL catalog (plus biotools_id index) for later use
+    output_file = "biotools_python_tools.jsonl"
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(qdrant_data, f, indent=2, ensure_ascii=False)
-        print(f"\n💾 Data saved to {output_file}")
+        write_catalog(qdrant_data, output_file)
+        print(f"\n💾 Data saved to {output_file} (index: {index_path(output_file)})")
         print(f"   Ready for import into Qdrant vector database!")
     except Exception as e:
         print(f"❌ Failed to save data: {e}")
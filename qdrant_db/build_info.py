@@ -0,0 +1,78 @@
+"""
+Build records of the tool collections
+
+Every collection built by rebuild_collection.py (or restored by snapshot.py)
+gets a record of the embedding model and embedding text version it was built
+with, stored in the small "collection_builds" registry collection. Anything
+that switches the serving alias or exports a snapshot checks it against
+EMBEDDING_MODEL, so queries are never encoded with a different model than
+the collection.
+"""
+
+import os
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, PointStruct, VectorParams
+
+DEFAULT_MODEL = "microsoft/BiomedNLP-BiomedBERT-base-uncased-abstract-fulltext"
+BUILDS_COLLECTION = "collection_builds"
+
+
+def configured_model() -> str:
+    """Embedding model the RAG agent and search server encode queries with"""
+    return os.getenv("EMBEDDING_MODEL") or DEFAULT_MODEL
+
+
+def resolve_collection(client: QdrantClient, name: str) -> str:
+    """Collection behind an alias (name itself if it is not an alias)"""
+    for alias in client.get_aliases().aliases:
+        if alias.alias_name == name:
+            return alias.collection_name
+    return name
+
+
+def _record_id(collection_name: str) -> str:
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"build:{collection_name}"))
+
+
+def record_build(client: QdrantClient, collection_name: str, model_name: str, text_version: int):
+    """Store (or overwrite) the build record of collection_name"""
+    if not client.collection_exists(collection_name=BUILDS_COLLECTION):
+        # Records are only ever looked up by id; the 1-d vector is a placeholder
+        client.create_collection(collection_name=BUILDS_COLLECTION,
+                                 vectors_config=VectorParams(size=1, distance=Distance.DOT))
+    client.upsert(collection_name=BUILDS_COLLECTION, points=[PointStruct(
+        id=_record_id(collection_name),
+        vector=[1.0],
+        payload={
+            "collection": collection_name,
+            "embedding_model": model_name,
+            "embedding_text_version": text_version,
+            "built_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+    )])
+
+
+def get_build(client: QdrantClient, collection_name: str) -> Optional[Dict[str, Any]]:
+    """Build record of a collection or alias (None if it was built before records were kept)"""
+    if not client.collection_exists(collection_name=BUILDS_COLLECTION):
+        return None
+    points = client.retrieve(collection_name=BUILDS_COLLECTION,
+                             ids=[_record_id(resolve_collection(client, collection_name))], with_payload=True)
+    return points[0].payload if points else None
+
+
+def delete_build(client: QdrantClient, collection_name: str):
+    if client.collection_exists(collection_name=BUILDS_COLLECTION):
+        client.delete(collection_name=BUILDS_COLLECTION, points_selector=[_record_id(collection_name)])
+
+
+def model_mismatch(build: Optional[Dict[str, Any]], model_name: str) -> Optional[str]:
+    """Description of the mismatch between a build record and model_name (None if they match or are unknown)"""
+    if build and build["embedding_model"] != model_name:
+        return (f"'{build['collection']}' was embedded with '{build['embedding_model']}', "
+                f"but queries are encoded with '{model_name}'")
+    return None
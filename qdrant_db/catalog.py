@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Bio.tools Catalog Storage
+
+Compact on-disk format for the scraped tool catalog, replacing the single
+indented JSON array:
+
+1. <name>.jsonl           - one compact {"text", "metadata"} entry per line
+2. <name>.idx.json        - byte offset/length of every entry, keyed by biotools_id
+3. <name>.vectors.npy     - optional float32 embedding matrix, one row per line
+   <name>.vectors.json      (plus the model name it was built with)
+
+Entries can be streamed line by line, looked up individually by biotools_id
+without parsing the rest of the file, and projected to selected metadata
+fields. The legacy JSON array is still readable by load_catalog().
+
+Usage:
+    python catalog.py convert biotools_python_tools.json [biotools_python_tools.jsonl]
+"""
+
+import json
+import os
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+INDEX_FORMAT_VERSION = 1
+
+
+def _base_path(path: str) -> str:
+    """Strip the .jsonl / .json extension of a catalog path"""
+    base, ext = os.path.splitext(path)
+    return base if ext in (".jsonl", ".json") else path
+
+
+def index_path(path: str) -> str:
+    return _base_path(path) + ".idx.json"
+
+
+def vectors_path(path: str) -> str:
+    return _base_path(path) + ".vectors.npy"
+
+
+def _vectors_meta_path(path: str) -> str:
+    return _base_path(path) + ".vectors.json"
+
+
+def _project(entry: Dict, fields: Optional[Iterable[str]]) -> Dict:
+    """Keep only the selected metadata fields (and the text if "text" is selected)"""
+    if fields is None:
+        return entry
+    fields = set(fields)
+    projected = {"metadata": {k: v for k, v in entry["metadata"].items() if k in fields}}
+    if "text" in fields:
+        projected["text"] = entry["text"]
+    return projected
+
+
+def write_catalog(entries: Iterable[Dict], path: str) -> int:
+    """
+    Write catalog entries as compact JSONL together with the biotools_id index
+
+    Args:
+        entries: {"text": ..., "metadata": {...}} dicts as produced by the scraper
+        path: Output .jsonl path
+
+    Returns:
+        Number of entries written
+    """
+    offsets = {}
+    count = 0
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        for entry in entries:
+            line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+            offsets[entry["metadata"]["biotools_id"]] = [f.tell(), len(line), count]
+            f.write(line)
+            count += 1
+    os.replace(tmp_path, path)
+
+    with open(index_path(path), "w", encoding="utf-8") as f:
+        json.dump({"format": INDEX_FORMAT_VERSION, "count": count, "offsets": offsets},
+                  f, separators=(",", ":"))
+    return count
+
+
+def iter_catalog(path: str, fields: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+    """
+    Stream catalog entries one at a time
+
+    Args:
+        path: .jsonl catalog (or legacy .json array, which has to be loaded fully)
+        fields: Optional metadata fields to keep, e.g. ["biotools_id", "name"];
+                include "text" to keep the description text as well
+
+    Yields:
+        Catalog entries in file order
+    """
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            for entry in json.load(f):
+                yield _project(entry, fields)
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield _project(json.loads(line), fields)
+
+
+def load_catalog(path: str, fields: Optional[Iterable[str]] = None) -> List[Dict]:
+    """Load all catalog entries into a list (accepts .jsonl or the legacy .json array)"""
+    return list(iter_catalog(path, fields))
+
+
+def find_catalog(directory: str, name: str = "biotools_python_tools") -> str:
+    """Return the catalog in directory, preferring the .jsonl format over the legacy .json"""
+    jsonl = os.path.join(directory, name + ".jsonl")
+    return jsonl if os.path.exists(jsonl) else os.path.join(directory, name + ".json")
+
+
+class Catalog:
+    """Random access to a .jsonl catalog through its biotools_id index"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(index_path(path), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("format") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported catalog index format: {index.get('format')}")
+        self._offsets = index["offsets"]
+        self._file = open(path, "rb")
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __contains__(self, biotools_id: str) -> bool:
+        return biotools_id in self._offsets
+
+    def ids(self) -> List[str]:
+        """All biotools_ids in file order"""
+        return sorted(self._offsets, key=lambda tool_id: self._offsets[tool_id][0])
+
+    def row(self, biotools_id: str) -> int:
+        """Line number of a tool, i.e. its row in the vector sidecar"""
+        return self._offsets[biotools_id][2]
+
+    def get(self, biotools_id: str, fields: Optional[Iterable[str]] = None) -> Optional[Dict]:
+        """Read a single entry without touching the rest of the file (None if unknown)"""
+        location = self._offsets.get(biotools_id)
+        if location is None:
+            return None
+        offset, length, _ = location
+        self._file.seek(offset)
+        return _project(json.loads(self._file.read(length)), fields)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_vectors(path: str, vectors, model_name: str, text_version: int = 1):
+    """
+    Save the embedding matrix sidecar for a catalog
+
+    Args:
+        path: Catalog path the vectors belong to
+        vectors: (n_entries, dim) array, row i embedding line i of the catalog
+        model_name: Embedding model the vectors were produced with
+        text_version: Version of the embedding text recipe (upload_data.EMBEDDING_TEXT_VERSION)
+    """
+    import numpy as np
+
+    matrix = np.asarray(vectors, dtype=np.float32)
+    np.save(vectors_path(path), matrix)
+    with open(_vectors_meta_path(path), "w", encoding="utf-8") as f:
+        json.dump({"model": model_name, "text_version": text_version,
+                   "count": int(matrix.shape[0]), "dim": int(matrix.shape[1])}, f)
+
+
+def load_vectors(path: str, model_name: str, count: Optional[int] = None, text_version: int = 1):
+    """
+    Memory-map the embedding matrix sidecar of a catalog
+
+    Returns:
+        The (n_entries, dim) matrix, or None if there is no sidecar, it was built
+        with a different model or embedding text, or it does not have `count` rows
+    """
+    import numpy as np
+
+    try:
+        with open(_vectors_meta_path(path), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except FileNotFoundError:
+        return None
+    if meta.get("model") != model_name or meta.get("text_version", 1) != text_version:
+        return None
+    if count is not None and meta.get("count") != count:
+        return None
+    return np.load(vectors_path(path), mmap_mode="r")
+
+
+def convert(json_path: str, jsonl_path: Optional[str] = None) -> Tuple[str, int]:
+    """Convert a legacy indented JSON catalog to the JSONL format"""
+    jsonl_path = jsonl_path or _base_path(json_path) + ".jsonl"
+    count = write_catalog(iter_catalog(json_path), jsonl_path)
+    return jsonl_path, count
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] != "convert":
+        print(__doc__)
+        sys.exit(1)
+
+    json_path = sys.argv[2]
+    jsonl_path, count = convert(json_path, sys.argv[3] if len(sys.argv) > 3 else None)
+    print(f"✅ Converted {count} tools: {json_path} -> {jsonl_path} (+ {index_path(jsonl_path)})")
+    print(f"   {os.path.getsize(json_path) / 1e6:.2f} MB -> {os.path.getsize(jsonl_path) / 1e6:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
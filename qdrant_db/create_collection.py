@@ -1,30 +1,56 @@
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams
+from qdrant_client.models import Distance, HnswConfigDiff, PayloadSchemaType, VectorParams
 import os
+import json
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+def load_hnsw_settings():
+    """Return (hnsw_config, vectors_on_disk) from hnsw_settings.json, or (None, None) for Qdrant's defaults"""
+    # Apply tuned HNSW settings if tune_hnsw.py has produced them
+    settings_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hnsw_settings.json")
+    if not os.path.exists(settings_path):
+        return None, None
 
-# Get Qdrant credentials from environment variables
-api_key = os.getenv("QDRANT_API_KEY")
-cluster_url = os.getenv("QDRANT_CLUSTER_URL")
+    with open(settings_path, "r", encoding="utf-8") as f:
+        settings = json.load(f)
+    print(f"Using tuned HNSW settings from {settings_path}: {settings['hnsw_config']}")
+    return HnswConfigDiff(**settings["hnsw_config"]), settings.get("vectors_on_disk")
 
-# Connect to Qdrant cluster if credentials are available, otherwise use local
-if api_key and cluster_url:
-    client = QdrantClient(url=cluster_url, api_key=api_key)
-    print("Connected to Qdrant cloud cluster")
-else:
-    client = QdrantClient(url="http://localhost:6333")
-    print("Connected to local Qdrant instance")
-
-colName = "OmiyDB"
-
-if not client.collection_exists(collection_name=colName):
+def create_collection(client, colName, vector_size=768):
+    """Create a cosine collection with the tuned (or default) HNSW settings"""
+    hnsw_config, vectors_on_disk = load_hnsw_settings()
     client.create_collection(
         collection_name=colName,
-        vectors_config=VectorParams(size=768, distance=Distance.COSINE) # assumes dimensions of microsoft/BiomedNLP-BiomedBERT-base-uncased-abstract-fulltext
+        vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE, on_disk=vectors_on_disk),
+        hnsw_config=hnsw_config,
     )
-    print(f"Collection '{colName}' created successfully!")
-else:
-    print(f"Collection '{colName}' already exists.")
\ No newline at end of file
+    # Search results are grouped by tool and single tools are looked up by their ID
+    client.create_payload_index(collection_name=colName, field_name="biotools_id",
+                                field_schema=PayloadSchemaType.KEYWORD)
+
+def main():
+    # Load environment variables from .env file
+    load_dotenv()
+
+    # Get Qdrant credentials from environment variables
+    api_key = os.getenv("QDRANT_API_KEY")
+    cluster_url = os.getenv("QDRANT_CLUSTER_URL")
+
+    # Connect to Qdrant cluster if credentials are available, otherwise use local
+    if api_key and cluster_url:
+        client = QdrantClient(url=cluster_url, api_key=api_key)
+        print("Connected to Qdrant cloud cluster")
+    else:
+        client = QdrantClient(url="http://localhost:6333")
+        print("Connected to local Qdrant instance")
+
+    colName = os.getenv("COLLECTION_NAME") or "OmiyDB"
+
+    if not client.collection_exists(collection_name=colName):
+        create_collection(client, colName) # 768 = dimensions of microsoft/BiomedNLP-BiomedBERT-base-uncased-abstract-fulltext
+        print(f"Collection '{colName}' created successfully!")
+    else:
+        print(f"Collection '{colName}' already exists.")
+
+if __name__ == "__main__":
+    main()
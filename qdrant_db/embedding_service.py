@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Local Embedding Service
+
+Owns a single copy of the embedding model and serves batched encode requests
+over a Unix socket (or localhost TCP), so ingestion, the search CLI and the
+RAG agent on one host don't each load their own ~440MB BiomedBERT.
+
+Wire format (both directions): 4-byte big-endian header length + JSON header,
+followed in responses by the raw float32 vector matrix described by the header.
+
+    python embedding_service.py                        # unix socket (default)
+    python embedding_service.py --address 127.0.0.1:7999
+
+Clients call get_encoder(model_name): it returns a ServiceEncoder when the
+service is running with that model and falls back to an in-process
+SentenceTransformer otherwise. Both expose the same encode() method. If the
+service goes away later, a ServiceEncoder reconnects once and then switches
+to an in-process model for good.
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import struct
+import sys
+import tempfile
+import threading
+import time
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+DEFAULT_ADDRESS = "unix:" + os.path.join(tempfile.gettempdir(), "bio-embedding.sock")
+MAX_HEADER_BYTES = 64 * 1024 * 1024
+
+_HEADER_LENGTH = struct.Struct(">I")
+
+
+def service_address() -> str:
+    return os.getenv("EMBEDDING_SERVICE") or DEFAULT_ADDRESS
+
+
+def _parse_address(address: str) -> Tuple[int, Union[str, Tuple[str, int]]]:
+    """"unix:/path.sock" or "host:port" -> (socket family, address)"""
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    host, port = address.rsplit(":", 1)
+    return socket.AF_INET, (host, int(port))
+
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    buf = bytearray(n)
+    view = memoryview(buf)
+    received = 0
+    while received < n:
+        chunk = sock.recv_into(view[received:], n - received)
+        if not chunk:
+            raise ConnectionError("connection closed by peer")
+        received += chunk
+    return bytes(buf)
+
+
+def _send_message(sock: socket.socket, header: dict, body: bytes = b""):
+    encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    sock.sendall(_HEADER_LENGTH.pack(len(encoded)) + encoded + body)
+
+
+def _recv_header(sock: socket.socket) -> dict:
+    (length,) = _HEADER_LENGTH.unpack(_recv_exact(sock, _HEADER_LENGTH.size))
+    if length > MAX_HEADER_BYTES:
+        raise ValueError(f"header of {length} bytes exceeds the limit")
+    return json.loads(_recv_exact(sock, length))
+
+
+# ---------------------------
+# Server
+# ---------------------------
+class _EncodeHandler(socketserver.BaseRequestHandler):
+    """Serves requests on one connection until the client disconnects"""
+
+    def handle(self):
+        server = self.server
+        while True:
+            try:
+                request = _recv_header(self.request)
+            except (ConnectionError, OSError):
+                return
+
+            op = request.get("op", "encode")
+            try:
+                if op == "info":
+                    _send_message(self.request, {"model": server.model_name, "dim": server.dim})
+                elif op == "encode":
+                    texts = request["texts"]
+                    start = time.perf_counter()
+                    # A single model instance; torch already spreads one batch over all cores
+                    with server.model_lock:
+                        vectors = server.model.encode(texts, batch_size=request.get("batch_size", 32),
+                                                      normalize_embeddings=request.get("normalize", False))
+                    matrix = np.ascontiguousarray(vectors, dtype=np.float32).reshape(len(texts), server.dim)
+                    _send_message(self.request, {"shape": list(matrix.shape), "dtype": "float32",
+                                                 "encode_ms": round((time.perf_counter() - start) * 1000, 2)},
+                                  matrix.tobytes())
+                else:
+                    _send_message(self.request, {"error": f"unknown op '{op}'"})
+            except Exception as e:
+                _send_message(self.request, {"error": f"{e.__class__.__name__}: {e}"})
+
+
+class _UnixEncodeServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _TCPEncodeServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def serve(address: str, model_name: str, threads: int):
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(threads)
+    model = SentenceTransformer(model_name)
+
+    family, bind_address = _parse_address(address)
+    if family == socket.AF_UNIX:
+        if os.path.exists(bind_address):
+            os.unlink(bind_address)
+        server = _UnixEncodeServer(bind_address, _EncodeHandler)
+    else:
+        server = _TCPEncodeServer(bind_address, _EncodeHandler)
+
+    server.model = model
+    server.model_name = model_name
+    server.dim = model.get_sentence_embedding_dimension()
+    server.model_lock = threading.Lock()
+
+    print(f"🧠 Serving '{model_name}' ({server.dim}d, {threads} threads) on {address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if family == socket.AF_UNIX and os.path.exists(bind_address):
+            os.unlink(bind_address)
+
+
+# ---------------------------
+# Client
+# ---------------------------
+class EmbeddingServiceClient:
+    """Connection to a running embedding service (one persistent socket, thread-safe)"""
+
+    def __init__(self, address: Optional[str] = None, timeout: float = 120.0):
+        self.address = address or service_address()
+        family, connect_address = _parse_address(self.address)
+        self._sock = socket.socket(family, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(connect_address)
+        self._lock = threading.Lock()
+        info = self._request({"op": "info"})
+        self.model_name = info["model"]
+        self.dim = info["dim"]
+
+    def _request(self, header: dict) -> dict:
+        _send_message(self._sock, header)
+        response = _recv_header(self._sock)
+        if "error" in response:
+            raise RuntimeError(f"embedding service: {response['error']}")
+        return response
+
+    def encode_batch(self, texts: List[str], batch_size: int = 32, normalize: bool = False) -> np.ndarray:
+        """
+        Raises:
+            ConnectionError: the connection failed; it is closed, since a partly read
+                response would leave the stream out of sync
+        """
+        with self._lock:
+            try:
+                header = self._request({"op": "encode", "texts": texts, "batch_size": batch_size,
+                                        "normalize": normalize})
+                rows, dim = header["shape"]
+                body = _recv_exact(self._sock, rows * dim * 4)
+            except (OSError, ValueError) as e:
+                self._sock.close()
+                raise ConnectionError(f"embedding service connection lost: {e}") from e
+        return np.frombuffer(body, dtype=np.float32).reshape(rows, dim)
+
+    def close(self):
+        self._sock.close()
+
+
+class ServiceEncoder:
+    """
+    Drop-in replacement for SentenceTransformer.encode() backed by the embedding service
+
+    Texts are sent in batch_size-sized requests, so a large input never waits on a
+    single long response. When the connection fails it reconnects once; if that fails
+    too (or the service now serves another model) it loads the model in-process and
+    uses it from then on. These notices go to stderr, since stdout may carry a
+    protocol stream (e.g. the MCP server).
+    """
+
+    def __init__(self, client: EmbeddingServiceClient, model_name: str):
+        self.client = client
+        self.model_name = model_name
+        self.dim = client.dim
+        self._local_model = None
+        self._lock = threading.Lock()
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def _reconnect(self, failed_client: EmbeddingServiceClient, error: Exception):
+        """Replace a broken connection with a new one, or fall back to a local model"""
+        with self._lock:
+            if self._local_model is not None or self.client is not failed_client:
+                return  # another thread already recovered
+            try:
+                client = EmbeddingServiceClient(failed_client.address)
+            except Exception:
+                client = None
+            if client is not None and client.model_name == self.model_name:
+                print(f"🔌 Reconnected to the embedding service at {client.address}", file=sys.stderr)
+                self.client = client
+                return
+            if client is not None:
+                client.close()
+        self._fall_back_local(error)
+
+    def _fall_back_local(self, error: Exception):
+        with self._lock:
+            if self._local_model is None:
+                print(f"⚠️  Embedding service unavailable ({error}), loading '{self.model_name}' locally",
+                      file=sys.stderr)
+                from sentence_transformers import SentenceTransformer
+                self._local_model = SentenceTransformer(self.model_name)
+
+    def _encode_remote(self, texts: List[str], batch_size: int, normalize: bool) -> Optional[np.ndarray]:
+        """Encode via the service, reconnecting once; None once the local model has taken over"""
+        client = self.client
+        try:
+            return client.encode_batch(texts, batch_size=batch_size, normalize=normalize)
+        except ConnectionError as e:
+            self._reconnect(client, e)
+        if self._local_model is not None:
+            return None
+        try:
+            return self.client.encode_batch(texts, batch_size=batch_size, normalize=normalize)
+        except ConnectionError as e:
+            self._fall_back_local(e)
+            return None
+
+    def encode(self, sentences: Union[str, Sequence[str]], batch_size: int = 32,
+               normalize_embeddings: bool = False, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.empty((0, self.dim), dtype=np.float32)
+
+        chunks = []
+        done = 0
+        while done < len(texts) and self._local_model is None:
+            vectors = self._encode_remote(texts[done:done + batch_size], batch_size, normalize_embeddings)
+            if vectors is None:
+                break
+            chunks.append(vectors)
+            done += len(vectors)
+        if done < len(texts):
+            # The local model has taken over; it encodes the rest in one call
+            chunks.append(self._local_model.encode(texts[done:], batch_size=batch_size,
+                                                   normalize_embeddings=normalize_embeddings, **kwargs))
+        vectors = np.concatenate(chunks) if len(chunks) > 1 else chunks[0]
+        return vectors[0] if single else vectors
+
+
+def get_encoder(model_name: str):
+    """
+    Return an encoder for model_name: the shared embedding service if it is running
+    with that model, otherwise an in-process SentenceTransformer
+    """
+    try:
+        client = EmbeddingServiceClient()
+    except OSError:
+        client = None
+    except Exception as e:
+        print(f"⚠️  Embedding service at {service_address()} is not usable ({e}), loading the model locally")
+        client = None
+
+    if client is not None:
+        if client.model_name == model_name:
+            print(f"Using embedding service at {client.address}")
+            return ServiceEncoder(client, model_name)
+        print(f"⚠️  Embedding service serves '{client.model_name}', not '{model_name}'; loading the model locally")
+        client.close()
+
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared local embedding service")
+    parser.add_argument("--address", default=None,
+                        help=f"unix:/path.sock or host:port (default: $EMBEDDING_SERVICE or {DEFAULT_ADDRESS})")
+    parser.add_argument("--model", default=None, help="embedding model (default: $EMBEDDING_MODEL or BiomedBERT)")
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1, help="torch threads (default: all cores)")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    model_name = (args.model or os.getenv("EMBEDDING_MODEL")
+                  or "microsoft/BiomedNLP-BiomedBERT-base-uncased-abstract-fulltext")
+    serve(args.address or service_address(), model_name, args.threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+EDAM Facet Centroids
+
+Precomputes one centroid vector (plus tool count) per EDAM topic and operation
+found in the tool collection and stores them in a small auxiliary collection
+(<collection>_facets). The RAG agent searches the centroids first to pick the
+likely topics/operations and then runs a filtered search within them; the same
+data powers fast "browse by topic" listings.
+
+Versioned collections (rebuild_collection.py) get their own facets collection,
+built before the switch; the <alias>_facets alias is repointed in the same
+atomic alias update as the serving alias, so routing never sees a half-built
+facets collection or centroids of another version. Refreshing the facets of the
+live collection (upload_data.py, this script) builds a fresh
+<collection>_facets_<timestamp> collection and swaps the facets aliases to it.
+
+Usage:
+    python facets.py        # rebuild the facets of $COLLECTION_NAME (default OmiyDB)
+"""
+
+import os
+import re
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+from qdrant_client import QdrantClient
+from qdrant_client.models import (CreateAlias, CreateAliasOperation, DeleteAlias, DeleteAliasOperation, Distance,
+                                  FieldCondition, Filter, MatchAny, MatchValue, PayloadSchemaType, Range,
+                                  PointStruct, VectorParams)
+
+from build_info import resolve_collection
+from qdrant_connection import get_qdrant_client
+
+# EDAM payload fields of a tool -> facet kind stored in the facets collection
+FACET_FIELDS = {"topics": "topic", "operations": "operation"}
+
+
+FACETS_SUFFIX = "_facets"
+# Refreshed facets are built into <collection>_facets_<timestamp>
+_FACETS_VERSION = re.compile(rf"{FACETS_SUFFIX}(_\d{{8}}T\d{{6}})?$")
+
+
+def facets_collection_name(collection_name: str) -> str:
+    return f"{collection_name}{FACETS_SUFFIX}"
+
+
+def is_facets_collection(name: str) -> bool:
+    """True for facets collections, plain or refreshed"""
+    return _FACETS_VERSION.search(name) is not None
+
+
+def facets_target(client: QdrantClient, collection_name: str) -> Optional[str]:
+    """Collection holding the facets of collection_name (None if it has none)"""
+    name = resolve_collection(client, facets_collection_name(collection_name))
+    return name if client.collection_exists(collection_name=name) else None
+
+
+def delete_facets(client: QdrantClient, collection_name: str):
+    """Delete every facets collection of collection_name (plain and refreshed); their aliases go with them"""
+    for collection in client.get_collections().collections:
+        if (collection.name.startswith(collection_name)
+                and _FACETS_VERSION.fullmatch(collection.name[len(collection_name):])):
+            client.delete_collection(collection_name=collection.name)
+
+
+def _scroll_vectors(client: QdrantClient, collection_name: str, batch_size: int = 512):
+    """Yield (vector, payload) for every point of the collection"""
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            limit=batch_size,
+            offset=offset,
+            with_payload=list(FACET_FIELDS),
+            with_vectors=True,
+        )
+        for point in points:
+            yield point.vector, point.payload
+        if offset is None:
+            return
+
+
+def compute_centroids(vectors: np.ndarray, payloads: List[dict]) -> List[Tuple[str, str, np.ndarray, int]]:
+    """
+    Mean of the (unit-normalized) vectors of all tools annotated with each term
+
+    Returns:
+        (kind, term, centroid, count) for every topic and operation
+    """
+    normalized = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    rows: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+    for row, payload in enumerate(payloads):
+        for field, kind in FACET_FIELDS.items():
+            for term in set(payload.get(field) or []):
+                rows[(kind, term)].append(row)
+
+    centroids = []
+    for (kind, term), term_rows in rows.items():
+        centroid = normalized[term_rows].mean(axis=0)
+        centroid /= max(np.linalg.norm(centroid), 1e-12)
+        centroids.append((kind, term, centroid, len(term_rows)))
+    return centroids
+
+
+def build_facets(client: QdrantClient, collection_name: str, facets_name: Optional[str] = None) -> int:
+    """
+    (Re)build the facets collection of collection_name and index its EDAM payload fields
+
+    Build the facets of a new version before pointing the aliases at it (see facets_alias_operations);
+    facets that may be serving are refreshed with refresh_facets instead.
+
+    Args:
+        facets_name: Collection to build into (default <collection_name>_facets); replaced if it exists
+
+    Returns:
+        Number of facets stored
+    """
+    vectors, payloads = [], []
+    for vector, payload in _scroll_vectors(client, collection_name):
+        vectors.append(vector)
+        payloads.append(payload)
+    if not vectors:
+        print(f"⚠️  '{collection_name}' is empty, no facets built")
+        return 0
+
+    centroids = compute_centroids(np.asarray(vectors, dtype=np.float32), payloads)
+
+    # Keyword indexes make the topic-filtered searches and browse listings cheap
+    for field in FACET_FIELDS:
+        client.create_payload_index(collection_name=collection_name, field_name=field,
+                                    field_schema=PayloadSchemaType.KEYWORD)
+
+    facets_name = facets_name or facets_collection_name(collection_name)
+    if client.collection_exists(collection_name=facets_name):
+        client.delete_collection(collection_name=facets_name)
+    client.create_collection(
+        collection_name=facets_name,
+        vectors_config=VectorParams(size=len(vectors[0]), distance=Distance.COSINE),
+    )
+    client.create_payload_index(collection_name=facets_name, field_name="kind", field_schema=PayloadSchemaType.KEYWORD)
+    client.create_payload_index(collection_name=facets_name, field_name="count", field_schema=PayloadSchemaType.INTEGER)
+
+    points = [
+        PointStruct(
+            id=str(uuid.uuid5(uuid.NAMESPACE_URL, f"edam:{kind}:{term}")),
+            vector=centroid.tolist(),
+            payload={"kind": kind, "term": term, "count": count},
+        )
+        for kind, term, centroid, count in centroids
+    ]
+    for start in range(0, len(points), 256):
+        client.upsert(collection_name=facets_name, points=points[start:start + 256])
+
+    print(f"🧭 Built {len(points)} facet centroids for {len(vectors)} tools in '{facets_name}'")
+    return len(points)
+
+
+def facets_alias_operations(client: QdrantClient, alias: str, collection_name: str) -> List:
+    """
+    Alias operations pointing <alias>_facets at the facets of collection_name
+
+    Meant to be sent in the same update_collection_aliases call that points alias at
+    collection_name. Without facets for collection_name the facets alias is dropped,
+    so routing falls back to global search instead of using another version's centroids.
+    """
+    facets_alias = facets_collection_name(alias)
+    operations = []
+    if resolve_collection(client, facets_alias) != facets_alias:
+        operations.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=facets_alias)))
+    facets_name = facets_target(client, collection_name)
+    if facets_name is not None:
+        operations.append(CreateAliasOperation(create_alias=CreateAlias(collection_name=facets_name,
+                                                                        alias_name=facets_alias)))
+    return operations
+
+
+def refresh_facets(client: QdrantClient, name: str) -> int:
+    """
+    Rebuild the facets of the collection serving name (an alias or a plain collection) without downtime
+
+    The centroids go into a fresh <collection>_facets_<timestamp> collection; <collection>_facets
+    (and <name>_facets for an alias) are then pointed at it in one alias update and the previous
+    facets collection is deleted, so routing sees the old or the new centroids, never a partial set.
+
+    Returns:
+        Number of facets stored
+    """
+    collection_name = resolve_collection(client, name)
+    base = facets_collection_name(collection_name)
+    previous = facets_target(client, collection_name)
+    fresh = f"{base}_{time.strftime('%Y%m%dT%H%M%S')}"
+    count = build_facets(client, collection_name, facets_name=fresh)
+    if not count:
+        return 0
+
+    if previous == base:
+        # Facets built in place by earlier versions block the alias; until it exists routing searches globally
+        client.delete_collection(collection_name=base)
+    operations = []
+    for facets_alias in dict.fromkeys([base, facets_collection_name(name)]):
+        if resolve_collection(client, facets_alias) != facets_alias:
+            operations.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=facets_alias)))
+        operations.append(CreateAliasOperation(create_alias=CreateAlias(collection_name=fresh, alias_name=facets_alias)))
+    client.update_collection_aliases(change_aliases_operations=operations)
+    if previous not in (None, base):
+        client.delete_collection(collection_name=previous)
+    print(f"🔀 Facets of '{name}' -> '{fresh}'")
+    return count
+
+
+def route_filter(client: QdrantClient, collection_name: str, query_vector: List[float], max_facets: int = 3,
+                 min_count: int = 3) -> Optional[Filter]:
+    """
+    Pick the facets closest to the query and return a filter matching tools in any of them
+
+    Returns:
+        The filter, or None if there are no facets to route with
+    """
+    facets_name = facets_collection_name(collection_name)
+    hits = client.search(
+        collection_name=facets_name,
+        query_vector=query_vector,
+        # Tiny facets are too narrow to route to on their own
+        query_filter=Filter(must_not=[FieldCondition(key="count", range=Range(lt=min_count))]),
+        limit=max_facets,
+        with_payload=True,
+    )
+    terms: Dict[str, List[str]] = defaultdict(list)
+    for hit in hits:
+        terms[hit.payload["kind"]].append(hit.payload["term"])
+    if not terms:
+        return None
+    field_by_kind = {kind: field for field, kind in FACET_FIELDS.items()}
+    return Filter(should=[
+        FieldCondition(key=field_by_kind[kind], match=MatchAny(any=kind_terms))
+        for kind, kind_terms in terms.items()
+    ])
+
+
+def list_facets(client: QdrantClient, collection_name: str, kind: str = "topic") -> List[Dict]:
+    """All facets of a kind ("topic" or "operation") with their tool counts, largest first"""
+    facets, offset = [], None
+    while True:
+        points, offset = client.scroll(
+            collection_name=facets_collection_name(collection_name),
+            scroll_filter=Filter(must=[FieldCondition(key="kind", match=MatchValue(value=kind))]),
+            limit=1024,
+            offset=offset,
+            with_payload=True,
+        )
+        facets += [{"term": p.payload["term"], "count": p.payload["count"]} for p in points]
+        if offset is None:
+            break
+    return sorted(facets, key=lambda facet: (-facet["count"], facet["term"]))
+
+
+def main():
+    load_dotenv()
+    client = get_qdrant_client()
+
+    # Facets of the collection currently serving the alias, swapped in once complete
+    refresh_facets(client, os.getenv("COLLECTION_NAME") or "OmiyDB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Qdrant connection shared by the qdrant_db scripts
+
+Uses the cloud cluster when QDRANT_API_KEY and QDRANT_CLUSTER_URL are set
+(call load_dotenv() first) and the local instance otherwise.
+"""
+
+import os
+from typing import Dict, Tuple
+
+from qdrant_client import QdrantClient
+
+LOCAL_URL = "http://localhost:6333"
+
+_qdrant_client = None
+
+
+def qdrant_endpoint() -> Tuple[str, Dict[str, str]]:
+    """(base URL, auth headers) of the configured Qdrant, for the REST calls the client doesn't wrap"""
+    api_key = os.getenv("QDRANT_API_KEY")
+    cluster_url = os.getenv("QDRANT_CLUSTER_URL")
+    if api_key and cluster_url:
+        return cluster_url.rstrip("/"), {"api-key": api_key}
+    return LOCAL_URL, {}
+
+
+def get_qdrant_client() -> QdrantClient:
+    """Get or create Qdrant client (singleton pattern)"""
+    global _qdrant_client
+    if _qdrant_client is None:
+        url, headers = qdrant_endpoint()
+        if headers:
+            _qdrant_client = QdrantClient(url=url, api_key=headers["api-key"])
+            print("Connected to Qdrant cloud cluster")
+        else:
+            _qdrant_client = QdrantClient(url=url)
+            print("Connected to local Qdrant instance")
+    return _qdrant_client
@@ -1,9 +1,10 @@
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams
-from sentence_transformers import SentenceTransformer
 import os
 from dotenv import load_dotenv
 
+from embedding_service import get_encoder
+from tool_search import search_tools
+
 
 def main():
     # Load environment variables from .env file
@@ -22,24 +23,19 @@ def main():
         client = QdrantClient(url="http://localhost:6333")
         print("Connected to local Qdrant instance")
 
-    # Load the embedding model
-    model = SentenceTransformer(embedding_model)
+    # Load the embedding model (or use the shared embedding service if it is running)
+    model = get_encoder(embedding_model)
 
     # Query the database
     query = input("Enter a query: ")
     query_vector = model.encode(query).tolist()
-    search_result = client.search(
-        collection_name=collection_name,
-        query_vector=query_vector,
-        limit=3,
-        with_payload=True,
-        with_vectors=True
-    )
+    # Only the displayed fields are fetched, one hit per tool
+    search_result = search_tools(client, collection_name, query_vector, limit=3,
+                                 fields=["biotools_id", "name", "description"])
     # Display the search results
     print("Search Results:")
     for hit in search_result:
-        print(f"ID: {hit.id} \nScore: {hit.score} \nTool: {hit.payload['name']} \nDescription: {hit.payload['description']}\n")
-        print("Vector:", hit.vector[:5], "...")
+        print(f"ID: {hit.id} \nScore: {hit.score} \nTool: {hit.name} ({hit.biotools_id}) \nDescription: {hit.description}\n")
         print("-" * 40)
     # Handle case where no results are found
     if not search_result:
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Zero-Downtime Collection Rebuild
+
+Re-embeds the tool catalog into a new, versioned collection while the live
+one keeps serving, then switches the serving alias atomically:
+
+1. Create <alias>_v<timestamp> with the tuned HNSW settings
+2. Embed and upsert the catalog in throttled batches
+3. Validate the new collection (point count, self-retrieval, optional query set)
+4. Point the alias at the new collection in one atomic alias update
+5. Keep the previous version(s) around for rollback
+
+The embedding model of every version is recorded (build_info.py). Building
+with a model other than EMBEDDING_MODEL, which the agent and search server
+encode queries with, is refused unless --allow-model-change is given.
+
+The RAG agent, search server and uploader only ever use the alias
+(COLLECTION_NAME, default "OmiyDB").
+
+Usage:
+    python rebuild_collection.py [--model NAME] [--pause 0.2] [--queries queries.txt]
+    python rebuild_collection.py --list
+    python rebuild_collection.py --rollback
+"""
+
+import argparse
+import os
+import random
+import time
+import uuid
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from qdrant_client import QdrantClient
+from qdrant_client.models import (CreateAlias, CreateAliasOperation, DeleteAlias, DeleteAliasOperation,
+                                  PointStruct)
+
+from build_info import configured_model, delete_build, get_build, model_mismatch, record_build
+from catalog import find_catalog, load_catalog
+from embedding_service import get_encoder
+from create_collection import create_collection
+from facets import build_facets, delete_facets, facets_alias_operations, facets_target, is_facets_collection
+from qdrant_connection import get_qdrant_client
+from upload_data import EMBEDDING_TEXT_VERSION, create_embedding_text
+
+
+def tool_point_id(biotools_id: str) -> str:
+    """Deterministic point id, so the same tool gets the same id in every version"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"https://bio.tools/{biotools_id}"))
+
+
+def version_prefix(alias: str) -> str:
+    return f"{alias}_v"
+
+
+def list_versions(client: QdrantClient, alias: str) -> List[str]:
+    """All versioned collections for an alias, oldest first"""
+    prefix = version_prefix(alias)
+    return sorted(c.name for c in client.get_collections().collections
+                  if c.name.startswith(prefix) and not is_facets_collection(c.name))
+
+
+def current_target(client: QdrantClient, alias: str) -> Optional[str]:
+    """Collection the alias currently points to (None if the alias does not exist)"""
+    for a in client.get_aliases().aliases:
+        if a.alias_name == alias:
+            return a.collection_name
+    return None
+
+
+def switch_alias(client: QdrantClient, alias: str, collection_name: str):
+    """Atomically (re)point the alias, and the facets alias, to collection_name and its facets"""
+    operations = []
+    if current_target(client, alias) is not None:
+        operations.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias)))
+    operations.append(CreateAliasOperation(create_alias=CreateAlias(collection_name=collection_name, alias_name=alias)))
+    operations += facets_alias_operations(client, alias, collection_name)
+    client.update_collection_aliases(change_aliases_operations=operations)
+    print(f"🔀 Alias '{alias}' -> '{collection_name}'")
+
+
+def build_version(client: QdrantClient, name: str, tools: List[dict], model, batch_size: int, pause: float):
+    """Create the versioned collection and fill it in throttled batches"""
+    create_collection(client, name, vector_size=model.get_sentence_embedding_dimension())
+    print(f"🏗️  Created collection '{name}'")
+
+    for start in range(0, len(tools), batch_size):
+        batch = tools[start:start + batch_size]
+        vectors = model.encode([create_embedding_text(tool) for tool in batch], batch_size=batch_size)
+        points = []
+        for tool, vector in zip(batch, vectors):
+            payload = tool['metadata'].copy()
+            payload['description'] = tool['text']
+            points.append(PointStruct(id=tool_point_id(payload['biotools_id']), vector=vector.tolist(), payload=payload))
+        # wait=True keeps at most one batch in flight; the pause leaves headroom for live searches
+        client.upsert(collection_name=name, points=points, wait=True)
+        print(f"   Uploaded {min(start + batch_size, len(tools))}/{len(tools)}")
+        if pause:
+            time.sleep(pause)
+
+
+def validate_version(client: QdrantClient, name: str, tools: List[dict], model, live: Optional[str],
+                     queries: List[str], sample_size: int, min_self_recall: float, k: int = 5) -> bool:
+    """
+    Check the new collection before it goes live
+
+    - it contains one point per catalog tool
+    - a sample of tools finds itself in the top k when searched by its own text
+    - every validation query returns results (overlap with the live collection is reported)
+    """
+    count = client.count(collection_name=name, exact=True).count
+    if count != len(tools):
+        print(f"❌ Validation failed: {count} points, expected {len(tools)}")
+        return False
+
+    sample = random.Random(0).sample(tools, min(sample_size, len(tools)))
+    vectors = model.encode([create_embedding_text(tool) for tool in sample])
+    found = 0
+    for tool, vector in zip(sample, vectors):
+        hits = client.search(collection_name=name, query_vector=vector.tolist(), limit=k, with_payload=["biotools_id"])
+        found += any(hit.payload.get("biotools_id") == tool['metadata']['biotools_id'] for hit in hits)
+    self_recall = found / len(sample) if sample else 1.0
+    print(f"🔎 Self-retrieval recall@{k}: {self_recall:.3f} (minimum {min_self_recall})")
+    if self_recall < min_self_recall:
+        print("❌ Validation failed: self-retrieval recall too low")
+        return False
+
+    if queries:
+        overlaps = []
+        for query, vector in zip(queries, model.encode(queries)):
+            hits = client.search(collection_name=name, query_vector=vector.tolist(), limit=k, with_payload=["biotools_id"])
+            if not hits:
+                print(f"❌ Validation failed: no results for query '{query}'")
+                return False
+            if live:
+                try:
+                    live_hits = client.search(collection_name=live, query_vector=vector.tolist(), limit=k,
+                                              with_payload=["biotools_id"])
+                except Exception:
+                    continue  # the live collection was built with a model of a different vector size
+                new_ids = {hit.payload.get("biotools_id") for hit in hits}
+                live_ids = {hit.payload.get("biotools_id") for hit in live_hits}
+                overlaps.append(len(new_ids & live_ids) / k)
+        if overlaps:
+            print(f"📊 Mean top-{k} overlap with the live collection: {sum(overlaps) / len(overlaps):.2f}")
+
+    print("✅ Validation passed")
+    return True
+
+
+def prune_versions(client: QdrantClient, alias: str, keep: int):
+    """Delete old versions, keeping the live one plus the `keep` most recent previous versions"""
+    live = current_target(client, alias)
+    previous = [name for name in list_versions(client, alias) if name != live]
+    for name in previous[:max(len(previous) - keep, 0)]:
+        client.delete_collection(collection_name=name)
+        delete_facets(client, name)
+        delete_build(client, name)
+        print(f"🗑️  Deleted old version '{name}'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the tool collection and swap it in via an alias")
+    parser.add_argument("--model", help="embedding model (default: $EMBEDDING_MODEL or BiomedBERT)")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--pause", type=float, default=0.2, help="seconds to sleep between upsert batches")
+    parser.add_argument("--queries", help="text file with validation queries, one per line")
+    parser.add_argument("--sample-size", type=int, default=100, help="tools used for the self-retrieval check")
+    parser.add_argument("--min-self-recall", type=float, default=0.9)
+    parser.add_argument("--keep", type=int, default=1, help="previous versions kept for rollback")
+    parser.add_argument("--replace-legacy", action="store_true",
+                        help="delete a plain collection named like the alias so the alias can be created")
+    parser.add_argument("--allow-model-change", action="store_true",
+                        help="switch the alias even though --model differs from $EMBEDDING_MODEL")
+    parser.add_argument("--list", action="store_true", help="list versions and exit")
+    parser.add_argument("--rollback", action="store_true", help="point the alias back to the previous version")
+    args = parser.parse_args()
+
+    load_dotenv()
+    client = get_qdrant_client()
+
+    alias = os.getenv("COLLECTION_NAME") or "OmiyDB"
+    live = current_target(client, alias)
+
+    if args.list:
+        for name in list_versions(client, alias):
+            build = get_build(client, name)
+            model = f"{build['embedding_model']} (text v{build['embedding_text_version']})" if build else "unknown model"
+            print(f"{'*' if name == live else ' '} {name}  {model}")
+        return
+
+    if args.rollback:
+        previous = [name for name in list_versions(client, alias) if name != live and (live is None or name < live)]
+        if not previous:
+            print("❌ No previous version to roll back to")
+            return
+        mismatch = model_mismatch(get_build(client, previous[-1]), configured_model())
+        if mismatch:
+            print(f"⚠️  WARNING: {mismatch}. Set EMBEDDING_MODEL accordingly and restart the agent and search server.")
+        if facets_target(client, previous[-1]) is None:
+            build_facets(client, previous[-1])
+        switch_alias(client, alias, previous[-1])
+        return
+
+    # A plain collection with the alias' name (created before aliases were used) blocks the alias
+    if live is None and client.collection_exists(collection_name=alias):
+        if not args.replace_legacy:
+            print(f"❌ '{alias}' is a plain collection, not an alias. Re-run with --replace-legacy to replace it "
+                  f"with the new version (searches fail briefly between the delete and the alias switch).")
+            return
+
+    model_name = args.model or configured_model()
+    if model_name != configured_model():
+        if not args.allow_model_change:
+            print(f"❌ --model '{model_name}' differs from EMBEDDING_MODEL '{configured_model()}', which the agent and "
+                  f"search server encode queries with. Set EMBEDDING_MODEL={model_name} (and restart them after the "
+                  f"switch), or pass --allow-model-change.")
+            return
+        print(f"⚠️  WARNING: building with '{model_name}' while EMBEDDING_MODEL is '{configured_model()}'. "
+              f"Queries will be encoded with the wrong model until EMBEDDING_MODEL is updated.")
+    model = get_encoder(model_name)
+    print(f"Model '{model_name}' loaded successfully!")
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    tools = load_catalog(find_catalog(script_dir))
+
+    name = f"{version_prefix(alias)}{time.strftime('%Y%m%dT%H%M%S')}"
+    start = time.perf_counter()
+    build_version(client, name, tools, model, args.batch_size, args.pause)
+    record_build(client, name, model_name, EMBEDDING_TEXT_VERSION)
+    print(f"⏱️  Built '{name}' in {time.perf_counter() - start:.1f}s")
+
+    queries = []
+    if args.queries:
+        with open(args.queries, "r", encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+
+    if not validate_version(client, name, tools, model, live, queries, args.sample_size, args.min_self_recall):
+        print(f"⚠️  Keeping '{alias}' on '{live}'. The rejected build '{name}' was left for inspection.")
+        return
+
+    build_facets(client, name)
+    if live is None and client.collection_exists(collection_name=alias):
+        client.delete_collection(collection_name=alias)
+        # Its plain facets collection would block the facets alias
+        delete_facets(client, alias)
+        print(f"🗑️  Deleted legacy collection '{alias}'")
+    switch_alias(client, alias, name)
+    prune_versions(client, alias, args.keep)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Vector Store Snapshots
+
+Exports the serving collection as a versioned, checksummed Qdrant snapshot
+with a manifest describing how its vectors were produced, and restores it
+into another Qdrant instance in one step - no re-embedding required:
+
+    python snapshot.py export [--dir snapshots]
+    python snapshot.py restore snapshots/OmiyDB_v20260101T000000.manifest.json
+
+The manifest takes the embedding model and text version from the
+collection's build record (build_info.py); collections built before records
+were kept can only be exported with an explicit --model.
+
+The restore verifies the checksum and refuses snapshots whose embedding model
+or embedding text recipe differ from the ones configured here, since queries
+encoded with another model would silently return garbage.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Optional
+
+import requests
+from dotenv import load_dotenv
+from qdrant_client import QdrantClient
+
+from build_info import configured_model, get_build, record_build
+from facets import build_facets
+from qdrant_connection import get_qdrant_client, qdrant_endpoint
+from rebuild_collection import current_target, switch_alias
+from upload_data import EMBEDDING_TEXT_VERSION
+
+MANIFEST_FORMAT_VERSION = 1
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def export_snapshot(client: QdrantClient, base_url: str, headers: dict, alias: str, out_dir: str,
+                    model_name: Optional[str] = None) -> str:
+    """
+    Snapshot the collection behind the alias, download it and write its manifest
+
+    Args:
+        model_name: Embedding model of the collection; required when it has no build
+            record, otherwise it must match the record
+
+    Returns:
+        Path of the manifest file
+    """
+    collection_name = current_target(client, alias) or alias
+    build = get_build(client, collection_name)
+    if build:
+        if model_name and model_name != build["embedding_model"]:
+            raise ValueError(f"'{collection_name}' was built with '{build['embedding_model']}', not '{model_name}'")
+        model_name, text_version = build["embedding_model"], build["embedding_text_version"]
+    elif model_name:
+        text_version = EMBEDDING_TEXT_VERSION
+    else:
+        raise ValueError(f"'{collection_name}' has no build record, so its embedding model is unknown. "
+                         f"Pass --model with the model it was embedded with.")
+    info = client.get_collection(collection_name=collection_name)
+    vectors_config = info.config.params.vectors
+
+    print(f"📸 Creating snapshot of '{collection_name}'...")
+    snapshot = client.create_snapshot(collection_name=collection_name, wait=True)
+
+    os.makedirs(out_dir, exist_ok=True)
+    snapshot_path = os.path.join(out_dir, f"{collection_name}.snapshot")
+    url = f"{base_url}/collections/{collection_name}/snapshots/{snapshot.name}"
+    with requests.get(url, headers=headers, stream=True, timeout=600) as response:
+        response.raise_for_status()
+        with open(snapshot_path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=1 << 20):
+                f.write(chunk)
+    # The server-side copy is no longer needed once downloaded
+    client.delete_snapshot(collection_name=collection_name, snapshot_name=snapshot.name)
+
+    manifest = {
+        "format": MANIFEST_FORMAT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "collection": collection_name,
+        "alias": alias,
+        "snapshot_file": os.path.basename(snapshot_path),
+        "sha256": sha256_file(snapshot_path),
+        "size_bytes": os.path.getsize(snapshot_path),
+        "points_count": info.points_count,
+        "vector_size": vectors_config.size,
+        "distance": vectors_config.distance.value,
+        "embedding_model": model_name,
+        "embedding_text_version": text_version,
+    }
+    manifest_path = os.path.join(out_dir, f"{collection_name}.manifest.json")
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"✅ Exported {info.points_count} points ({manifest['size_bytes'] / 1e6:.1f} MB) to {snapshot_path}")
+    return manifest_path
+
+
+def restore_snapshot(client: QdrantClient, base_url: str, headers: dict, manifest_path: str, alias: str,
+                     model_name: str, force: bool = False):
+    """
+    Verify a snapshot against its manifest and the local configuration, upload it and point the alias at it
+    """
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != MANIFEST_FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot manifest format: {manifest.get('format')}")
+
+    if manifest["embedding_model"] != model_name:
+        raise ValueError(f"Snapshot was embedded with '{manifest['embedding_model']}', "
+                         f"but this environment uses '{model_name}'")
+    if manifest["embedding_text_version"] != EMBEDDING_TEXT_VERSION:
+        raise ValueError(f"Snapshot uses embedding text version {manifest['embedding_text_version']}, "
+                         f"but this checkout uses version {EMBEDDING_TEXT_VERSION}")
+
+    snapshot_path = os.path.join(os.path.dirname(os.path.abspath(manifest_path)), manifest["snapshot_file"])
+    print(f"🔐 Verifying checksum of {snapshot_path}...")
+    if sha256_file(snapshot_path) != manifest["sha256"]:
+        raise ValueError("Snapshot checksum does not match the manifest")
+
+    collection_name = manifest["collection"]
+    if client.collection_exists(collection_name=collection_name) and not force:
+        raise ValueError(f"Collection '{collection_name}' already exists (use --force to overwrite it)")
+
+    print(f"📤 Uploading snapshot into '{collection_name}'...")
+    with open(snapshot_path, "rb") as f:
+        response = requests.post(
+            f"{base_url}/collections/{collection_name}/snapshots/upload",
+            params={"priority": "snapshot", "wait": "true"},
+            headers=headers,
+            files={"snapshot": (manifest["snapshot_file"], f)},
+            timeout=1800,
+        )
+    response.raise_for_status()
+
+    points_count = client.count(collection_name=collection_name, exact=True).count
+    if points_count != manifest["points_count"]:
+        raise ValueError(f"Restored {points_count} points, manifest says {manifest['points_count']}")
+    record_build(client, collection_name, manifest["embedding_model"], manifest["embedding_text_version"])
+
+    if current_target(client, alias) is None and client.collection_exists(collection_name=alias):
+        print(f"⚠️  '{alias}' is a plain collection; restored '{collection_name}' without switching the alias")
+    else:
+        build_facets(client, collection_name)
+        switch_alias(client, alias, collection_name)
+    print(f"✅ Restored {points_count} points")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export / restore snapshots of the tool collection")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="snapshot the collection behind the alias")
+    export_parser.add_argument("--dir", default="snapshots", help="output directory (default: snapshots)")
+    export_parser.add_argument("--model", help="embedding model of a collection without a build record")
+    restore_parser = subparsers.add_parser("restore", help="restore a snapshot and point the alias at it")
+    restore_parser.add_argument("manifest", help="manifest .json written by export")
+    restore_parser.add_argument("--force", action="store_true", help="overwrite an existing collection")
+    args = parser.parse_args()
+
+    load_dotenv()
+    client = get_qdrant_client()
+    base_url, headers = qdrant_endpoint()
+
+    alias = os.getenv("COLLECTION_NAME") or "OmiyDB"
+
+    try:
+        if args.command == "export":
+            export_snapshot(client, base_url, headers, alias, args.dir, args.model)
+        else:
+            restore_snapshot(client, base_url, headers, args.manifest, alias, configured_model(), args.force)
+    except (ValueError, requests.RequestException) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
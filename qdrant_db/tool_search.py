@@ -0,0 +1,143 @@
+"""
+Lean tool search shared by query_data.py, the RAG agent and the MCP search server
+
+Only the payload fields the caller asks for are transferred, vectors only on
+request, and hits are grouped by biotools_id so several points of the same tool
+(e.g. left behind by repeated uploads) come back as a single result. Callers that
+rerank a wide candidate pool fetch it with SUMMARY_FIELDS and load the remaining
+fields for the hits they keep with fetch_details.
+"""
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import Filter, SearchParams, SearchRequest
+
+# Payload fields of a tool point
+TOOL_FIELDS = ["biotools_id", "name", "description", "homepage", "topics", "operations", "language"]
+# Enough to list a hit without its description and EDAM annotations
+SUMMARY_FIELDS = ["biotools_id", "name", "homepage"]
+
+
+class ToolHit:
+    """One search result; fields that were not requested keep their defaults"""
+
+    __slots__ = ("id", "score", "biotools_id", "name", "description", "homepage", "topics", "operations",
+                 "language", "vector")
+
+    def __init__(self, point):
+        self.id = point.id
+        self.score = getattr(point, "score", None)
+        self.biotools_id = ""
+        self.name = "Unknown"
+        self.description = "No description"
+        self.homepage = "No URL"
+        self.topics = []
+        self.operations = []
+        self.language = []
+        self.vector = point.vector
+        self.update(point.payload or {})
+
+    def update(self, payload: Mapping[str, Any]):
+        """Fill in the tool fields present in a (partial) payload"""
+        for field in TOOL_FIELDS:
+            if field in payload:
+                setattr(self, field, payload[field])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Tool information as a plain dict (the format of the RAG workflow state and MCP responses)"""
+        return {
+            "name": self.name,
+            "description": self.description,
+            "homepage": self.homepage,
+            "topics": self.topics,
+            "operations": self.operations,
+            "language": self.language,
+            "biotools_id": self.biotools_id,
+            "relevance_score": self.score,
+        }
+
+    def __repr__(self) -> str:
+        return f"ToolHit({self.biotools_id!r}, score={self.score})"
+
+
+def _dedupe(hits: List[ToolHit]) -> List[ToolHit]:
+    """Keep the best-scoring hit of each tool (hits are already ordered by score)"""
+    seen = set()
+    unique = []
+    for hit in hits:
+        key = hit.biotools_id or hit.id
+        if key not in seen:
+            seen.add(key)
+            unique.append(hit)
+    return unique
+
+
+def search_tools(
+    client: QdrantClient,
+    collection_name: str,
+    query_vector: List[float],
+    limit: int,
+    fields: Sequence[str] = TOOL_FIELDS,
+    with_vectors: bool = False,
+    query_filter: Optional[Filter] = None,
+    search_params: Optional[SearchParams] = None,
+) -> List[ToolHit]:
+    """
+    Search for the `limit` most relevant tools, one hit per biotools_id (grouped server-side)
+
+    Args:
+        fields: Payload fields to transfer
+        with_vectors: Also transfer the point vectors (e.g. for MMR)
+    """
+    result = client.search_groups(
+        collection_name=collection_name,
+        query_vector=query_vector,
+        group_by="biotools_id",
+        group_size=1,
+        limit=limit,
+        query_filter=query_filter,
+        search_params=search_params,
+        with_payload=list(fields),
+        with_vectors=with_vectors,
+    )
+    return [ToolHit(group.hits[0]) for group in result.groups]
+
+
+def fetch_details(client: QdrantClient, collection_name: str, hits: List[ToolHit],
+                  fields: Sequence[str] = TOOL_FIELDS) -> List[ToolHit]:
+    """Load the given payload fields of hits found with a lean field set, in one request"""
+    if hits:
+        points = client.retrieve(collection_name=collection_name, ids=[hit.id for hit in hits],
+                                 with_payload=list(fields), with_vectors=False)
+        payloads = {point.id: point.payload or {} for point in points}
+        for hit in hits:
+            hit.update(payloads.get(hit.id, {}))
+    return hits
+
+
+def search_tools_batch(
+    client: QdrantClient,
+    collection_name: str,
+    query_vectors: List[List[float]],
+    limit: int,
+    fields: Sequence[str] = TOOL_FIELDS,
+    with_vectors: bool = False,
+    query_filter: Optional[Filter] = None,
+    search_params: Optional[SearchParams] = None,
+) -> List[List[ToolHit]]:
+    """
+    search_tools for several queries in one round trip
+
+    Qdrant has no batched group search, so a few extra points are fetched per
+    query and duplicates of a tool are collapsed client-side instead.
+    """
+    batch_results = client.search_batch(
+        collection_name=collection_name,
+        requests=[
+            SearchRequest(vector=vector, filter=query_filter, limit=limit * 2, params=search_params,
+                          with_payload=list(fields), with_vector=with_vectors)
+            for vector in query_vectors
+        ],
+    )
+    return [_dedupe([ToolHit(point) for point in points])[:limit] for points in batch_results]
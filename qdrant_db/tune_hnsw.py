@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+HNSW Parameter Sweep
+
+Builds temporary collections from the tool catalog over a grid of HNSW and
+storage settings and reports the recall / latency / memory trade-off of each:
+
+1. Load (or compute) the catalog embeddings
+2. Compute exact top-k ground truth for a query set with NumPy
+3. For every (m, ef_construct, on_disk) combination build a temporary
+   collection, wait for the HNSW index, and search it at every search-time ef
+4. Print the recall-latency Pareto frontier and write the recommended
+   settings to hnsw_settings.json, which create_collection.py applies
+
+Usage:
+    python tune_hnsw.py --m 8 16 32 --ef-construct 64 100 200 --ef 32 64 128
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+from qdrant_client import QdrantClient
+from qdrant_client.models import (Distance, HnswConfigDiff, OptimizersConfigDiff, PointStruct,
+                                  SearchParams, VectorParams)
+
+from build_info import configured_model
+from catalog import find_catalog, load_catalog, load_vectors
+from embedding_service import get_encoder
+from qdrant_connection import get_qdrant_client
+from upload_data import EMBEDDING_TEXT_VERSION, create_embedding_text
+
+SETTINGS_FILE = "hnsw_settings.json"
+TEMP_COLLECTION_PREFIX = "OmiyDB_tune_"
+
+
+def get_catalog_vectors(catalog_path: str, tools: List[Dict], model_name: str) -> np.ndarray:
+    """Use the catalog's vector sidecar if available, otherwise encode the catalog"""
+    vectors = load_vectors(catalog_path, model_name, count=len(tools), text_version=EMBEDDING_TEXT_VERSION)
+    if vectors is not None:
+        print(f"📦 Using precomputed embeddings for {len(tools)} tools")
+        return np.asarray(vectors, dtype=np.float32)
+
+    print(f"🧠 Encoding {len(tools)} tools with {model_name}...")
+    model = get_encoder(model_name)
+    texts = [create_embedding_text(tool) for tool in tools]
+    return model.encode(texts, batch_size=64, show_progress_bar=True).astype(np.float32)
+
+
+def get_query_vectors(args, vectors: np.ndarray, model_name: str) -> Tuple[np.ndarray, Optional[List[int]]]:
+    """
+    Encode the queries file, or sample catalog vectors as queries
+
+    Returns:
+        (query vectors, catalog row of each sampled query or None for a queries file)
+    """
+    if args.queries:
+        with open(args.queries, "r", encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+        print(f"🧠 Encoding {len(queries)} queries from {args.queries}...")
+        return get_encoder(model_name).encode(queries).astype(np.float32), None
+
+    rows = random.Random(args.seed).sample(range(len(vectors)), min(args.num_queries, len(vectors)))
+    return vectors[rows], rows
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int, self_ids: Optional[List[int]] = None) -> List[set]:
+    """Exact cosine top-k ids for every query, excluding the query's own point when it was sampled from the catalog"""
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    q = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = q @ normalized.T
+    if self_ids is not None:
+        # A query's own point is always found and would inflate recall
+        scores[np.arange(len(self_ids)), self_ids] = -np.inf
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return [set(row.tolist()) for row in top]
+
+
+def estimate_memory_mb(n: int, dim: int, m: int, vectors_on_disk: bool, hnsw_on_disk: bool) -> float:
+    """Rough RAM estimate: float32 vectors plus HNSW links (layer 0 with 2*m links per point dominates)"""
+    vector_bytes = 0 if vectors_on_disk else n * dim * 4
+    link_bytes = 0 if hnsw_on_disk else n * 2 * m * 4
+    return (vector_bytes + link_bytes) / 1e6
+
+
+def build_collection(client: QdrantClient, name: str, vectors: np.ndarray, m: int, ef_construct: int,
+                     on_disk: bool, batch_size: int = 256, timeout: float = 600):
+    """Create a collection with the given settings and wait until its HNSW index is built"""
+    if client.collection_exists(collection_name=name):
+        client.delete_collection(collection_name=name)
+    client.create_collection(
+        collection_name=name,
+        vectors_config=VectorParams(size=vectors.shape[1], distance=Distance.COSINE, on_disk=on_disk),
+        hnsw_config=HnswConfigDiff(m=m, ef_construct=ef_construct, on_disk=on_disk),
+        # Index right away; with the default threshold a catalog this small would never get an HNSW graph
+        optimizers_config=OptimizersConfigDiff(indexing_threshold=1),
+    )
+    for start in range(0, len(vectors), batch_size):
+        client.upsert(
+            collection_name=name,
+            points=[
+                PointStruct(id=i, vector=vectors[i].tolist())
+                for i in range(start, min(start + batch_size, len(vectors)))
+            ],
+        )
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        info = client.get_collection(collection_name=name)
+        if info.status.value == "green" and (info.indexed_vectors_count or 0) >= len(vectors):
+            return
+        time.sleep(0.5)
+    print(f"⚠️  Index for '{name}' not complete after {timeout:.0f}s, measuring anyway")
+
+
+def measure(client: QdrantClient, name: str, queries: np.ndarray, truth: List[set], k: int, ef: int,
+            self_ids: Optional[List[int]] = None) -> Dict:
+    """Search the collection with every query and return recall and latency percentiles"""
+    latencies = []
+    hits = 0
+    # Sampled catalog queries fetch one extra hit so their own point can be dropped
+    limit = k if self_ids is None else k + 1
+    for i, (query, expected) in enumerate(zip(queries, truth)):
+        start = time.perf_counter()
+        results = client.search(
+            collection_name=name,
+            query_vector=query.tolist(),
+            limit=limit,
+            search_params=SearchParams(hnsw_ef=ef),
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+        found = [hit.id for hit in results if self_ids is None or hit.id != self_ids[i]][:k]
+        hits += len(expected & set(found))
+    return {
+        "recall": hits / (len(truth) * k),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+    }
+
+
+def pareto_frontier(results: List[Dict]) -> List[Dict]:
+    """Configurations for which no other configuration has both higher recall and lower p95 latency"""
+    frontier = []
+    for r in sorted(results, key=lambda r: (r["p95_ms"], -r["recall"])):
+        if not frontier or r["recall"] > frontier[-1]["recall"]:
+            frontier.append(r)
+    return frontier
+
+
+def recommend(results: List[Dict], target_recall: float) -> Dict:
+    """Cheapest configuration reaching the target recall (or the most accurate one if none does)"""
+    good = [r for r in results if r["recall"] >= target_recall]
+    if not good:
+        return max(results, key=lambda r: (r["recall"], -r["p95_ms"]))
+    return min(good, key=lambda r: (r["p95_ms"], r["memory_mb"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep HNSW parameters and report recall vs. latency")
+    parser.add_argument("--m", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--ef-construct", type=int, nargs="+", default=[64, 100, 200])
+    parser.add_argument("--ef", type=int, nargs="+", default=[16, 32, 64, 128])
+    parser.add_argument("--on-disk", choices=["no", "yes", "both"], default="no",
+                        help="store vectors and HNSW graph on disk")
+    parser.add_argument("--k", type=int, default=10, help="recall@k")
+    parser.add_argument("--queries", help="text file with one query per line "
+                                          "(default: sample catalog entries, excluding their own point)")
+    parser.add_argument("--num-queries", type=int, default=200)
+    parser.add_argument("--target-recall", type=float, default=0.98)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    load_dotenv()
+    client = get_qdrant_client()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    catalog_path = find_catalog(script_dir)
+    tools = load_catalog(catalog_path)
+    model_name = configured_model()
+    vectors = get_catalog_vectors(catalog_path, tools, model_name)
+    queries, self_ids = get_query_vectors(args, vectors, model_name)
+    truth = exact_top_k(vectors, queries, args.k, self_ids)
+
+    on_disk_options = {"no": [False], "yes": [True], "both": [False, True]}[args.on_disk]
+    grid = list(itertools.product(args.m, args.ef_construct, on_disk_options))
+    print(f"🔬 Sweeping {len(grid)} index configurations x {len(args.ef)} search ef values "
+          f"({len(queries)} queries, recall@{args.k})")
+
+    results = []
+    for i, (m, ef_construct, on_disk) in enumerate(grid, 1):
+        name = f"{TEMP_COLLECTION_PREFIX}{i}"
+        print(f"\n🏗️  [{i}/{len(grid)}] m={m} ef_construct={ef_construct} on_disk={on_disk}")
+        build_start = time.perf_counter()
+        try:
+            build_collection(client, name, vectors, m, ef_construct, on_disk)
+            build_s = time.perf_counter() - build_start
+            memory_mb = estimate_memory_mb(len(vectors), vectors.shape[1], m, on_disk, on_disk)
+            for ef in args.ef:
+                result = {"m": m, "ef_construct": ef_construct, "on_disk": on_disk, "ef": ef,
+                          "build_s": build_s, "memory_mb": memory_mb}
+                result.update(measure(client, name, queries, truth, args.k, ef, self_ids))
+                results.append(result)
+                print(f"   ef={ef:<4} recall={result['recall']:.4f} p50={result['p50_ms']:.2f}ms "
+                      f"p95={result['p95_ms']:.2f}ms mem≈{memory_mb:.1f}MB")
+        finally:
+            client.delete_collection(collection_name=name)
+
+    if not results:
+        print("❌ No configurations measured")
+        return
+
+    print("\n" + "=" * 50)
+    print("📈 RECALL-LATENCY FRONTIER")
+    print("=" * 50)
+    for r in pareto_frontier(results):
+        print(f"m={r['m']:<3} ef_construct={r['ef_construct']:<4} on_disk={str(r['on_disk']):<5} ef={r['ef']:<4} "
+              f"recall={r['recall']:.4f} p95={r['p95_ms']:.2f}ms mem≈{r['memory_mb']:.1f}MB")
+
+    best = recommend(results, args.target_recall)
+    settings = {
+        "hnsw_config": {"m": best["m"], "ef_construct": best["ef_construct"], "on_disk": best["on_disk"]},
+        "vectors_on_disk": best["on_disk"],
+        "search_hnsw_ef": best["ef"],
+        "measured": {key: best[key] for key in ("recall", "p50_ms", "p95_ms", "memory_mb")},
+        "target_recall": args.target_recall,
+        "num_points": len(vectors),
+    }
+    settings_path = os.path.join(script_dir, SETTINGS_FILE)
+    with open(settings_path, "w", encoding="utf-8") as f:
+        json.dump(settings, f, indent=2)
+
+    print(f"\n✅ Recommended: m={best['m']} ef_construct={best['ef_construct']} on_disk={best['on_disk']} "
+          f"search ef={best['ef']} (recall {best['recall']:.4f}, p95 {best['p95_ms']:.2f}ms)")
+    print(f"💾 Saved to {settings_path}; create_collection.py applies it, set HNSW_EF={best['ef']} for search")
+
+
+if __name__ == "__main__":
+    main()
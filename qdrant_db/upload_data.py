@@ -2,11 +2,16 @@ from qdrant_client import QdrantClient
 from qdrant_client.models import PointStruct, Filter, FieldCondition, MatchText
 from qdrant_client.http.exceptions import UnexpectedResponse
 
-from sentence_transformers import SentenceTransformer
 import os
 from dotenv import load_dotenv
 import uuid
-import json
+
+from catalog import find_catalog, load_catalog, load_vectors, vectors_path, write_vectors
+from embedding_service import get_encoder
+from facets import refresh_facets
+
+# Bump whenever create_embedding_text changes, so stored vectors/snapshots built with the old text are rejected
+EMBEDDING_TEXT_VERSION = 1
 
 def create_embedding_text(tool_data):
     base_text = tool_data["text"]
@@ -39,28 +44,36 @@ def main():
         client = QdrantClient(url="http://localhost:6333")
         print("Connected to local Qdrant instance")
 
-    colName = "OmiyDB"
+    colName = os.getenv("COLLECTION_NAME") or "OmiyDB" # may be an alias (see rebuild_collection.py)
 
     # Get the directory where this script is located
     script_dir = os.path.dirname(os.path.abspath(__file__))
     print(script_dir)
-    json_file_path = os.path.join(script_dir, 'biotools_python_tools.json')
-    print(json_file_path)
+    catalog_path = find_catalog(script_dir) # biotools_python_tools.jsonl, or the legacy .json array
+    print(catalog_path)
 
-    with open(json_file_path, 'r', encoding='utf-8') as file: # is an array of json objects
-        bioinformatics_tools = json.load(file)
+    bioinformatics_tools = load_catalog(catalog_path)
 
-    model_name = "microsoft/BiomedNLP-BiomedBERT-base-uncased-abstract-fulltext"
-    model = SentenceTransformer(model_name)
-    print(f"Model '{model_name}' loaded successfully!")
+    model_name = os.getenv("EMBEDDING_MODEL") or "microsoft/BiomedNLP-BiomedBERT-base-uncased-abstract-fulltext"
+
+    # Reuse precomputed embeddings from the catalog's vector sidecar if they match the model
+    precomputed_vectors = load_vectors(catalog_path, model_name, count=len(bioinformatics_tools),
+                                       text_version=EMBEDDING_TEXT_VERSION)
+    if precomputed_vectors is not None:
+        print(f"Using precomputed embeddings from {vectors_path(catalog_path)}")
+        model = None
+    else:
+        model = get_encoder(model_name) # shared embedding service if running, otherwise loads the model
+        print(f"Model '{model_name}' loaded successfully!")
 
     # Convert descriptions to embeddings and upload to Qdrant
     tool_ids = [] # e.g. 0a1ab736-8765-4900-827b-7dc6ebfd8f2b
     tool_vectors = [] # e.g. [-0.04451117664575577, 0.07700273394584656, ..., 0.3271920084953308]
     tool_payloads = [] # e.g. {'tool_name': 'BioPython', 'description': 'A set of freely ... for developers.', 'url': 'https://biopython.org/'}
+    texts_to_embed = []
 
     # Process each tool
-    for tool in bioinformatics_tools:
+    for row, tool in enumerate(bioinformatics_tools):
         tool_name = tool['metadata']['name']
         
         # Check if the tool already exists in the collection
@@ -89,16 +102,26 @@ def main():
         tool_id = str(uuid.uuid4())
         tool_ids.append(tool_id)
         
-        # Create vector embedding using the enhanced text
-        text_to_embed = create_embedding_text(tool)
-        vector = model.encode(text_to_embed).tolist()
-        tool_vectors.append(vector)
+        # Use the precomputed embedding, or collect the enhanced text for batched encoding below
+        if precomputed_vectors is not None:
+            tool_vectors.append(precomputed_vectors[row].tolist())
+        else:
+            texts_to_embed.append(create_embedding_text(tool))
         
         # Add payload with all tool data
         payload = tool['metadata'].copy()
         payload['description'] = tool['text']  # Add the descriptive text
         tool_payloads.append(payload)
 
+    # Create vector embeddings for all new tools in one batched call
+    if texts_to_embed:
+        tool_vectors = model.encode(texts_to_embed, batch_size=32, show_progress_bar=True).tolist()
+
+    # Keep the embeddings next to the catalog when the whole catalog was encoded, so re-ingests can skip the model
+    if model is not None and catalog_path.endswith(".jsonl") and len(tool_vectors) == len(bioinformatics_tools):
+        write_vectors(catalog_path, tool_vectors, model_name, text_version=EMBEDDING_TEXT_VERSION)
+        print(f"Saved embeddings to {vectors_path(catalog_path)}")
+
     # Only upload if we have tools to upload
     if tool_ids:
         # Upload in batches to avoid timeout
@@ -130,6 +153,9 @@ def main():
                 continue
         
         print(f"Successfully uploaded {total_uploaded} new bioinformatics tools to the collection '{colName}'")
+        
+        # Refresh the EDAM topic/operation centroids used for topic routing and browsing
+        refresh_facets(client, colName)
     else:
         print("No new tools to upload. All tools already exist in the collection.")
 
@@ -3,21 +3,63 @@ Bioinformatics RAG Agent using LangChain, LangGraph, and Qdrant
 This is the main file that orchestrates the entire RAG workflow
 """
 
-from typing import TypedDict, List, Dict, Any
+from typing import TypedDict, List, Dict, Any, Optional
 from langgraph.graph import StateGraph, START, END
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from qdrant_client import QdrantClient
-from sentence_transformers import SentenceTransformer
+from qdrant_client.models import Filter, SearchParams
+from rag_diversify import best_query_similarity, mmr_select
+from rag_query_expansion import expand_query, reciprocal_rank_fusion
+from rag_resilience import CircuitBreaker, LLMUnavailableError, call_with_deadline, format_fallback_answer
+from rag_query_log import get_query_logger, timed_stage
 import os
+import sys
+import time
 from dotenv import load_dotenv
 
+# Shared ingestion/search helpers live next to the ingestion scripts
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "qdrant_db"))
+from build_info import get_build, model_mismatch
+from embedding_service import get_encoder
+from facets import route_filter
+from tool_search import SUMMARY_FIELDS, ToolHit, fetch_details, search_tools, search_tools_batch
+
 load_dotenv()
 
+# Qdrant collection (normally an alias managed by qdrant_db/rebuild_collection.py) holding the tool embeddings
+COLLECTION_NAME = os.getenv("COLLECTION_NAME") or "OmiyDB"
+# Number of tools handed to the LLM
+TOP_K = 3
+# Candidates fetched from Qdrant before MMR diversification picks TOP_K of them
+MMR_FETCH_K = int(os.getenv("MMR_FETCH_K", "20"))
+# 1.0 = pure relevance (no diversification), 0.0 = pure diversity
+MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", "0.7"))
+# Search-time HNSW ef (see qdrant_db/tune_hnsw.py); unset uses the collection default
+HNSW_EF = int(os.getenv("HNSW_EF")) if os.getenv("HNSW_EF") else None
+# Query expansion before search: "off", "rules" (EDAM synonyms) or "llm" (EDAM synonyms + LLM rewrites)
+QUERY_EXPANSION = os.getenv("QUERY_EXPANSION", "off").lower()
+MAX_QUERY_VARIANTS = int(os.getenv("MAX_QUERY_VARIANTS", "4"))
+# Share of the latency budget LLM query expansion may use, so the answer still gets the rest
+QUERY_EXPANSION_BUDGET_S = float(os.getenv("QUERY_EXPANSION_BUDGET_S", "3"))
+# Topic routing: search the EDAM facet centroids (qdrant_db/facets.py) first and restrict the
+# search to the ROUTE_FACETS closest topics/operations, falling back to a global search
+TOPIC_ROUTING = os.getenv("TOPIC_ROUTING", "off").lower() == "on"
+ROUTE_FACETS = int(os.getenv("ROUTE_FACETS", "3"))
+# End-to-end latency budget per query; if the LLM would overrun it, a templated answer is returned instead
+LATENCY_BUDGET_S = float(os.getenv("RAG_LATENCY_BUDGET_S", "15"))
+# Timeout and retries of a single Gemini request
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", "20"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "1"))
+
 _qdrant_client = None
 _llm = None
 _embedding_model = None
+# Skips the LLM for 30s after 3 consecutive failures/timeouts
+_llm_breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30.0)
+# Query rewrites have a much shorter budget; their overruns must not open the answer breaker
+_expansion_breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30.0)
 
 # Initialize components
 def get_qdrant_client():
@@ -45,6 +87,8 @@ def get_llm():
             google_api_key=os.getenv("GOOGLE_API_KEY"),
             temperature=0.3,
             max_tokens=1024,
+            timeout=LLM_TIMEOUT_S,
+            max_retries=LLM_MAX_RETRIES,
         )
     return _llm
 
@@ -52,65 +96,126 @@ def get_embedding_model():
     """Get or create embedding model (singleton pattern)"""
     global _embedding_model
     if _embedding_model is None:
-        model_name = "microsoft/BiomedNLP-BiomedBERT-base-uncased-abstract-fulltext"
-        _embedding_model = SentenceTransformer(model_name)
+        model_name = os.getenv("EMBEDDING_MODEL") or "microsoft/BiomedNLP-BiomedBERT-base-uncased-abstract-fulltext"
+        _embedding_model = get_encoder(model_name) # shared embedding service if running, otherwise in-process
+        
+        # A collection rebuilt with another model (qdrant_db/rebuild_collection.py --model) can't be searched with this one
+        try:
+            mismatch = model_mismatch(get_build(get_qdrant_client(), COLLECTION_NAME), model_name)
+        except Exception:
+            mismatch = None  # no build record to compare with
+        if mismatch:
+            print(f"⚠️  WARNING: {mismatch}. Set EMBEDDING_MODEL to the collection's model.")
     return _embedding_model
 
 # Define the state for our agent
 class RAGState(TypedDict):
     """State for the RAG agent workflow"""
     user_query: str
+    query_expansion: Optional[str]  # overrides QUERY_EXPANSION for this query (None = use the setting)
+    query_variants: List[str]
     query_embedding: List[float]
+    query_embeddings: List[List[float]]
     search_results: List[Dict[str, Any]]
     formatted_answer: str
+    deadline: Optional[float]  # time.monotonic() by which the answer is due (None = no budget)
+    degraded: bool  # True if the answer was built from the search results without the LLM
+    timings: Dict[str, float]  # seconds spent in each workflow node
+
+def search_candidates(client: QdrantClient, query_embeddings: List[List[float]], fetch_k: int,
+                      search_params: Optional[SearchParams] = None, query_filter: Optional[Filter] = None) -> List[ToolHit]:
+    """
+    Fetch a wider candidate pool (one hit per tool) with vectors so near-duplicates can be pruned
+
+    Only SUMMARY_FIELDS are transferred; descriptions and EDAM fields are loaded for the selected tools only.
+    """
+    if len(query_embeddings) == 1:
+        return search_tools(client, COLLECTION_NAME, query_embeddings[0], fetch_k, fields=SUMMARY_FIELDS,
+                            with_vectors=True, query_filter=query_filter, search_params=search_params)
+    # One round trip for all query variants, merged with reciprocal rank fusion
+    batch_results = search_tools_batch(client, COLLECTION_NAME, query_embeddings, fetch_k, fields=SUMMARY_FIELDS,
+                                       with_vectors=True, query_filter=query_filter, search_params=search_params)
+    return reciprocal_rank_fusion(batch_results, key=lambda hit: hit.biotools_id)[:fetch_k]
 
 # Define the workflow nodes
+@timed_stage("embed_query")
 def embed_query(state: RAGState) -> RAGState:
-    """Convert user query to vector embedding"""
+    """Convert user query (and its expanded variants) to vector embeddings"""
     print("Step 1: Creating embedding for user query...")
     
+    # The LLM rewrite has its own breaker and spends at most QUERY_EXPANSION_BUDGET_S of the query's budget;
+    # on failure only rule variants are used
+    deadline = time.monotonic() + QUERY_EXPANSION_BUDGET_S
+    if state.get("deadline") is not None:
+        deadline = min(deadline, state["deadline"])
+    mode = state.get("query_expansion") or QUERY_EXPANSION
+    variants = expand_query(
+        state["user_query"],
+        mode=mode,
+        llm=get_llm() if mode == "llm" else None,
+        max_variants=MAX_QUERY_VARIANTS,
+        invoke=lambda fn: call_with_deadline(fn, breaker=_expansion_breaker, deadline=deadline),
+    )
+    state["query_variants"] = variants
+    
+    # Encode all variants in one batch; the first one is the original query
     embedding_model = get_embedding_model()
-    query_vector = embedding_model.encode(state["user_query"]).tolist()
-    state["query_embedding"] = query_vector
+    query_vectors = embedding_model.encode(variants).tolist()
+    state["query_embedding"] = query_vectors[0]
+    state["query_embeddings"] = query_vectors
     
     return state
 
+@timed_stage("search_vector_db")
 def search_vector_db(state: RAGState) -> RAGState:
     """Search Qdrant for relevant bioinformatics tools"""
     print("Step 2: Searching vector database...")
     
     client = get_qdrant_client()
     
-    # Search the database
-    search_results = client.search(
-        collection_name="OmiyDB",
-        query_vector=state["query_embedding"],
-        limit=3,  # Get top 3 most relevant tools
-        with_payload=True,
+    fetch_k = max(MMR_FETCH_K, TOP_K)
+    search_params = SearchParams(hnsw_ef=HNSW_EF) if HNSW_EF else None
+    query_embeddings = state.get("query_embeddings") or [state["query_embedding"]]
+    
+    query_filter = None
+    if TOPIC_ROUTING:
+        try:
+            query_filter = route_filter(client, COLLECTION_NAME, state["query_embedding"], max_facets=ROUTE_FACETS)
+        except Exception as e:
+            print(f"⚠️  Topic routing unavailable, searching globally: {e}")
+    
+    candidates = search_candidates(client, query_embeddings, fetch_k, search_params, query_filter)
+    # Too few tools in the routed topics: fall back to the whole collection
+    if query_filter is not None and len(candidates) < TOP_K:
+        print("Routed search found too few tools, searching globally")
+        candidates = search_candidates(client, query_embeddings, fetch_k, search_params)
+    
+    # Diversify the candidates (maximal marginal relevance); with several variants a tool is as
+    # relevant as its best-matching variant, so tools found only by a rewrite are not ranked last
+    candidate_vectors = [hit.vector for hit in candidates]
+    relevance = None
+    if len(query_embeddings) > 1 and candidates:
+        relevance = best_query_similarity(query_embeddings, candidate_vectors)
+    selected = mmr_select(
+        state["query_embedding"],
+        candidate_vectors,
+        k=TOP_K,
+        lambda_mult=MMR_LAMBDA,
+        relevance=relevance,
     )
+    search_results = fetch_details(client, COLLECTION_NAME, [candidates[i] for i in selected])
     
-    # Extract the relevant information
-    tools_found = []
-    for hit in search_results:
-        tool_info = {
-            "name": hit.payload.get("name", "Unknown"),
-            "description": hit.payload.get("description", "No description"),
-            "homepage": hit.payload.get("homepage", "No URL"),
-            "topics": hit.payload.get("topics", []),
-            "operations": hit.payload.get("operations", []),
-            "language": hit.payload.get("language", []),
-            "biotools_id": hit.payload.get("biotools_id", ""),
-            "relevance_score": hit.score
-        }
-        tools_found.append(tool_info)
+    # Only the selected tools are turned into dicts for the workflow state
+    tools_found = [hit.to_dict() for hit in search_results]
     
     state["search_results"] = tools_found
     print(f"Found {len(tools_found)} relevant tools")
     
     return state
 
+@timed_stage("format_answer")
 def format_answer_with_llm(state: RAGState) -> RAGState:
-    """Use Gemini to format a helpful answer based on search results"""
+    """Use Gemini to format a helpful answer based on search results (templated answer if it can't in time)"""
     print("Step 3: Formatting answer with LLM...")
     
     llm = get_llm()
@@ -151,10 +256,20 @@ Keep your response friendly, informative, and focused on the user's specific nee
     # Create and run the chain
     chain = prompt | llm | StrOutputParser()
     
-    formatted_answer = chain.invoke({
-        "query": state["user_query"],
-        "tools_context": tools_context
-    })
+    try:
+        formatted_answer = call_with_deadline(
+            lambda: chain.invoke({
+                "query": state["user_query"],
+                "tools_context": tools_context
+            }),
+            breaker=_llm_breaker,
+            deadline=state.get("deadline"),
+        )
+        state["degraded"] = False
+    except LLMUnavailableError as e:
+        print(f"⚠️  Falling back to a templated answer: {e}")
+        formatted_answer = format_fallback_answer(state["user_query"], state["search_results"], str(e))
+        state["degraded"] = True
     
     state["formatted_answer"] = formatted_answer
     
@@ -183,10 +298,21 @@ def create_rag_workflow():
     
     return app
 
-# Main function to run the agent
-def query_bioinformatics_tools(user_query: str):
-    """Main function to query bioinformatics tools"""
-    print(f"\n🔍 Processing query: '{user_query}'\n")
+def run_rag_workflow(user_query: str, latency_budget_s: Optional[float] = LATENCY_BUDGET_S,
+                     log_query: bool = True) -> RAGState:
+    """Run the RAG workflow and return its final state (including the `degraded` flag and stage timings)"""
+    started_at = time.time()
+    start = time.perf_counter()
+    deadline = time.monotonic() + latency_budget_s if latency_budget_s else None
+    
+    # Whether this query has to pay for loading/connecting the shared components
+    cache = {
+        "embedding_model": "warm" if _embedding_model is not None else "cold",
+        "qdrant_client": "warm" if _qdrant_client is not None else "cold",
+        "llm": "warm" if _llm is not None else "cold",
+        "llm_breaker": _llm_breaker.state,
+        "expansion_breaker": _expansion_breaker.state,
+    }
     
     # Create the workflow
     rag_app = create_rag_workflow()
@@ -194,9 +320,29 @@ def query_bioinformatics_tools(user_query: str):
     # Run the workflow
     result = rag_app.invoke({
         "user_query": user_query,
+        "query_expansion": None,
+        "query_variants": [],
         "query_embedding": [],
+        "query_embeddings": [],
         "search_results": [],
-        "formatted_answer": ""
+        "formatted_answer": "",
+        "deadline": deadline,
+        "degraded": False,
+        "timings": {}
     })
     
+    # Opt-in query log (RAG_QUERY_LOG)
+    query_logger = get_query_logger() if log_query else None
+    if query_logger:
+        query_logger.record(result, started_at, time.perf_counter() - start, cache)
+    
+    return result
+
+# Main function to run the agent
+def query_bioinformatics_tools(user_query: str):
+    """Main function to query bioinformatics tools"""
+    print(f"\n🔍 Processing query: '{user_query}'\n")
+    
+    result = run_rag_workflow(user_query)
+    
     return result["formatted_answer"]
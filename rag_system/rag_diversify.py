@@ -0,0 +1,79 @@
+"""
+Result diversification for the Bioinformatics RAG system
+Implements maximal marginal relevance (MMR) over retrieved candidates
+"""
+
+from typing import List, Optional, Sequence
+import numpy as np
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length so dot products are cosine similarities"""
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def best_query_similarity(
+    query_vectors: Sequence[Sequence[float]],
+    candidate_vectors: Sequence[Sequence[float]],
+) -> np.ndarray:
+    """Cosine similarity of each candidate to the query variant it matches best"""
+    candidates = _normalize_rows(np.asarray(candidate_vectors, dtype=np.float32))
+    queries = _normalize_rows(np.asarray(query_vectors, dtype=np.float32))
+    return (candidates @ queries.T).max(axis=1)
+
+
+def mmr_select(
+    query_vector: Sequence[float],
+    candidate_vectors: Sequence[Sequence[float]],
+    k: int,
+    lambda_mult: float = 0.5,
+    relevance: Optional[Sequence[float]] = None,
+) -> List[int]:
+    """
+    Pick k candidates using maximal marginal relevance
+
+    Args:
+        query_vector: Embedding of the user query
+        candidate_vectors: Embeddings of the retrieved candidates (one row each)
+        k: Number of candidates to keep
+        lambda_mult: Trade-off between relevance (1.0) and diversity (0.0)
+        relevance: Relevance of each candidate (cosine to query_vector if omitted),
+            e.g. from best_query_similarity when several query variants were searched
+
+    Returns:
+        Indices into candidate_vectors, in selection order
+    """
+    if not 0.0 <= lambda_mult <= 1.0:
+        raise ValueError(f"lambda_mult must be between 0 and 1, got {lambda_mult}")
+
+    candidates = np.asarray(candidate_vectors, dtype=np.float32)
+    n = candidates.shape[0] if candidates.ndim == 2 else 0
+    k = min(k, n)
+    if k <= 0:
+        return []
+
+    # All similarities are computed up front in one pass; the greedy loop below
+    # only does O(n) vector updates per pick
+    candidates = _normalize_rows(candidates)
+    if relevance is None:
+        relevance = candidates @ _normalize_rows(np.asarray(query_vector, dtype=np.float32))
+    else:
+        relevance = np.asarray(relevance, dtype=np.float32)
+    pairwise = candidates @ candidates.T
+
+    selected = [int(np.argmax(relevance))]
+    max_sim_to_selected = pairwise[selected[0]].copy()
+    available = np.ones(n, dtype=bool)
+    available[selected[0]] = False
+
+    while len(selected) < k:
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * max_sim_to_selected
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(max_sim_to_selected, pairwise[best], out=max_sim_to_selected)
+
+    return selected
@@ -0,0 +1,134 @@
+"""
+Query expansion for the Bioinformatics RAG system
+Reformulates terse user queries into EDAM vocabulary and fuses the rankings
+of all variants with reciprocal rank fusion (RRF)
+"""
+
+import re
+from typing import Any, Callable, Dict, Hashable, List, Sequence, Tuple
+
+# Common user phrasings -> (EDAM topics, EDAM operations) used in the tool annotations
+EDAM_SYNONYMS: Dict[str, Tuple[List[str], List[str]]] = {
+    r"\balign(ing|ment|er)?s?\b": (["Sequence analysis"], ["Sequence alignment", "Multiple sequence alignment"]),
+    r"\b(reads?|fastq)\b": (["Sequencing"], ["Read mapping", "Sequencing quality control"]),
+    r"\bmap(ping)?\b": ([], ["Read mapping", "Genome alignment"]),
+    r"\b(variants?|snps?|snvs?|mutations?)\b": (["Genetic variation"], ["Variant calling", "Variant effect prediction"]),
+    r"\bassembl(e|y|ing|er)\b": (["Sequence assembly"], ["Sequence assembly", "De-novo assembly"]),
+    r"\b(rna-?seq|transcriptom\w*|expression)\b": (["Transcriptomics", "RNA-Seq", "Gene expression"], ["Gene expression profiling", "Differential gene expression analysis"]),
+    r"\b(single[- ]cell|scrna\w*)\b": (["Single-cell sequencing"], ["Clustering"]),
+    r"\b(phylogen\w*|trees?|evolution\w*)\b": (["Phylogenetics", "Phylogeny"], ["Phylogenetic tree generation"]),
+    r"\b(protein structures?|3d structures?|folding|pdb)\b": (["Protein structure analysis", "Structural biology"], ["Protein structure prediction", "Structure visualisation"]),
+    r"\bannotat(e|ion|ing)\b": (["Genomics"], ["Genome annotation", "Gene prediction"]),
+    r"\b(visuali[sz]\w*|plot\w*|view\w*)\b": (["Data visualisation"], ["Visualisation"]),
+    r"\b(mass spec\w*|proteom\w*|peptides?)\b": (["Proteomics", "Proteomics experiment"], ["Peptide identification", "Mass spectrum visualisation"]),
+    r"\b(metabolom\w*|metabolites?)\b": (["Metabolomics"], ["Metabolic pathway prediction", "Metabolic network modelling"]),
+    r"\b(metagenom\w*|microbiome|16s)\b": (["Metagenomics", "Microbial ecology"], ["Taxonomic classification"]),
+    r"\b(chip-?seq|peaks?)\b": (["ChIP-seq"], ["Peak calling"]),
+    r"\b(methylation|epigen\w*)\b": (["Epigenomics"], ["Methylation analysis", "Methylation calling"]),
+    r"\b(quality control|qc)\b": ([], ["Sequencing quality control", "Quality control"]),
+    r"\b(genes? ontology|go terms?|enrichment)\b": (["Gene and protein families"], ["Gene-set enrichment analysis"]),
+    r"\b(networks?|interactions?)\b": (["Molecular interactions, pathways and networks"], ["Network analysis"]),
+    r"\b(docking|ligands?|drugs?)\b": (["Drug discovery", "Molecular modelling"], ["Molecular docking"]),
+}
+
+_COMPILED_SYNONYMS = [(re.compile(pattern, re.IGNORECASE), terms) for pattern, terms in EDAM_SYNONYMS.items()]
+
+
+def expand_with_rules(query: str) -> List[str]:
+    """
+    Add an EDAM-annotated variant of the query
+
+    The variant mirrors the "Topics: ... / Operations: ..." lines that are part of
+    every tool's embedding text (see qdrant_db/upload_data.py), so it lands close
+    to tools annotated with those terms.
+
+    Returns:
+        [query] or [query, annotated variant]
+    """
+    topics: List[str] = []
+    operations: List[str] = []
+    for pattern, (pattern_topics, pattern_operations) in _COMPILED_SYNONYMS:
+        if pattern.search(query):
+            topics += [t for t in pattern_topics if t not in topics]
+            operations += [o for o in pattern_operations if o not in operations]
+
+    if not topics and not operations:
+        return [query]
+
+    variant = query
+    if topics:
+        variant += f"\nTopics: {', '.join(topics)}"
+    if operations:
+        variant += f"\nOperations: {', '.join(operations)}"
+    return [query, variant]
+
+
+def expand_with_llm(query: str, llm, n: int = 2) -> List[str]:
+    """Ask the LLM for n reformulations of the query in EDAM terminology"""
+    prompt = (
+        f"Rewrite the following request for bioinformatics software as {n} short search queries "
+        "using EDAM ontology terminology (topics and operations). "
+        "Return one query per line without numbering or any other text.\n\n"
+        f"Request: {query}"
+    )
+    response = llm.invoke(prompt)
+    lines = [line.strip(" -*\t0123456789.") for line in str(response.content).splitlines()]
+    return [line for line in lines if line][:n]
+
+
+def expand_query(query: str, mode: str = "off", llm=None, max_variants: int = 4,
+                 invoke: Callable[[Callable[[], List[str]]], List[str]] = lambda fn: fn()) -> List[str]:
+    """
+    Build the list of query variants to search with
+
+    Args:
+        query: The user query (always the first variant)
+        mode: "off", "rules" (EDAM synonyms) or "llm" (EDAM synonyms + LLM reformulations)
+        llm: LLM used in "llm" mode
+        max_variants: Upper bound on the number of variants
+        invoke: Runs the LLM call (e.g. under a deadline and circuit breaker); its errors skip the LLM variants
+
+    Returns:
+        Unique query variants, starting with the original query
+    """
+    if mode == "off":
+        return [query]
+
+    variants = expand_with_rules(query)
+    n = max_variants - len(variants)
+    if mode == "llm" and llm is not None and n > 0:
+        try:
+            variants += invoke(lambda: expand_with_llm(query, llm, n=n))
+        except Exception as e:
+            print(f"⚠️  LLM query expansion failed, using rule-based variants only: {e}")
+
+    unique = list(dict.fromkeys(variants))
+    return unique[:max_variants]
+
+
+def reciprocal_rank_fusion(result_lists: Sequence[Sequence], k: int = 60,
+                           key: Callable[[Any], Hashable] = lambda hit: hit.id) -> List:
+    """
+    Merge several ranked hit lists into one ranking with reciprocal rank fusion
+
+    Each hit scores sum(1 / (k + rank)) over the lists it appears in. Hits are
+    identified by key(hit) (the point id by default); the first occurrence of a hit is returned.
+
+    Args:
+        result_lists: Ranked lists of Qdrant hits (one per query variant)
+        k: RRF damping constant (60 is the usual default)
+        key: Identity of a hit across the lists
+
+    Returns:
+        Hits ordered by fused score
+    """
+    fused_scores: Dict = {}
+    hits_by_id: Dict = {}
+    for hits in result_lists:
+        for rank, hit in enumerate(hits, 1):
+            hit_key = key(hit)
+            fused_scores[hit_key] = fused_scores.get(hit_key, 0.0) + 1.0 / (k + rank)
+            hits_by_id.setdefault(hit_key, hit)
+
+    ranked_ids = sorted(fused_scores, key=fused_scores.get, reverse=True)
+    return [hits_by_id[hit_key] for hit_key in ranked_ids]
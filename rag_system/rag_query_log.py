@@ -0,0 +1,89 @@
+"""
+Query log for the Bioinformatics RAG system
+Opt-in, append-only JSONL capture of every query with per-stage timings and hits.
+Enable it by setting RAG_QUERY_LOG to the log file path; replay it with replay_queries.py
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+def timed_stage(stage: str) -> Callable:
+    """Decorator for workflow nodes that records the node's duration in state["timings"][stage]"""
+    def decorator(node: Callable) -> Callable:
+        @functools.wraps(node)
+        def wrapper(state):
+            start = time.perf_counter()
+            result = node(state)
+            result.setdefault("timings", {})[stage] = round(time.perf_counter() - start, 4)
+            return result
+        return wrapper
+    return decorator
+
+
+class QueryLogger:
+    """Appends one JSON line per query; safe to share between threads"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def record(self, state: Dict[str, Any], started_at: float, total_s: float, cache: Dict[str, Any]):
+        """
+        Append the outcome of one workflow run
+
+        Args:
+            state: Final RAG workflow state
+            started_at: time.time() when the query arrived
+            total_s: End-to-end latency in seconds
+            cache: Warm/cold outcome of the cached components used by the query
+        """
+        entry = {
+            "ts": datetime.fromtimestamp(started_at, timezone.utc).isoformat(),
+            "epoch": round(started_at, 4),
+            "query": state["user_query"],
+            "variants": len(state.get("query_variants") or []),
+            "timings": state.get("timings", {}),
+            "total_s": round(total_s, 4),
+            "hits": [
+                {"id": tool["biotools_id"], "score": round(float(tool["relevance_score"]), 5)}
+                for tool in state.get("search_results", [])
+            ],
+            "degraded": state.get("degraded", False),
+            "cache": cache,
+        }
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+_query_logger: Optional[QueryLogger] = None
+
+
+def get_query_logger() -> Optional[QueryLogger]:
+    """Get or create the query logger (None unless RAG_QUERY_LOG is set)"""
+    global _query_logger
+    path = os.getenv("RAG_QUERY_LOG")
+    if not path:
+        return None
+    if _query_logger is None or _query_logger.path != path:
+        _query_logger = QueryLogger(path)
+    return _query_logger
+
+
+def read_query_log(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream the entries of a query log in the order they were written (completion order, not arrival order)"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def hit_ids(entry: Dict[str, Any]) -> List[str]:
+    return [hit["id"] for hit in entry.get("hits", [])]
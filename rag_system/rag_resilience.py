@@ -0,0 +1,144 @@
+"""
+Latency budget and circuit breaker for the Bioinformatics RAG system
+Lets the agent answer from the search results alone when the LLM is slow or failing
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional
+
+
+class LLMUnavailableError(Exception):
+    """Raised when the LLM call is skipped or does not finish within the latency budget"""
+
+
+class CircuitBreaker:
+    """
+    Skips calls to a failing dependency
+
+    closed    - calls go through; `failure_threshold` consecutive failures open the breaker
+    open      - calls are skipped until `reset_timeout` seconds have passed
+    half-open - a single trial call is let through; success closes, failure re-opens
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        """Return True if a call may be attempted now"""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def release(self):
+        """Give back a permitted call that never reached the dependency (neither success nor failure)"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+def remaining_time(deadline: Optional[float]) -> Optional[float]:
+    """Seconds left until a time.monotonic() deadline (None means no deadline)"""
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+# Sized for concurrent queries (e.g. replay_queries.py --workers); calls that overrun keep a worker busy
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("LLM_CALL_WORKERS", "16")), thread_name_prefix="llm-call")
+
+
+def call_with_deadline(fn: Callable[[], Any], breaker: CircuitBreaker, deadline: Optional[float],
+                       min_time: float = 0.5) -> Any:
+    """
+    Run fn unless the breaker is open or the deadline is too close, and give up when the deadline passes
+
+    A call that overruns the deadline keeps running in the background, but its
+    result is discarded and it counts as a failure. A call that never got a
+    worker before the deadline is cancelled and does not count against the breaker.
+
+    Raises:
+        LLMUnavailableError: the call was skipped, timed out or failed
+    """
+    remaining = remaining_time(deadline)
+    if remaining is not None and remaining < min_time:
+        raise LLMUnavailableError(f"only {max(remaining, 0):.2f}s of the latency budget left")
+    if not breaker.allow_request():
+        raise LLMUnavailableError("circuit breaker is open after repeated LLM failures")
+
+    started = threading.Event()
+
+    def run():
+        started.set()
+        return fn()
+
+    future = _executor.submit(run)
+    try:
+        result = future.result(timeout=remaining)
+    except FutureTimeoutError:
+        # Still queued behind other calls: the local pool was full, not the LLM slow
+        if not started.is_set() and future.cancel():
+            breaker.release()
+            raise LLMUnavailableError(f"no free LLM worker within the remaining {remaining:.2f}s")
+        breaker.record_failure()
+        raise LLMUnavailableError(f"LLM did not answer within the remaining {remaining:.2f}s")
+    except Exception as e:
+        breaker.record_failure()
+        raise LLMUnavailableError(f"LLM call failed: {e}") from e
+
+    breaker.record_success()
+    return result
+
+
+def format_fallback_answer(user_query: str, tools: List[Dict[str, Any]], reason: str) -> str:
+    """Deterministic answer built from the search results only"""
+    lines = [
+        f"⚠️ Quick answer (AI summary unavailable: {reason}).",
+        "",
+        f'Most relevant tools for "{user_query}":',
+    ]
+    if not tools:
+        lines.append("No matching tools were found.")
+    for i, tool in enumerate(tools, 1):
+        description = tool["description"]
+        if len(description) > 300:
+            description = description[:297] + "..."
+        lines.append("")
+        lines.append(f"{i}. {tool['name']} (relevance {tool['relevance_score']:.2f})")
+        lines.append(f"   {description}")
+        if tool["operations"]:
+            lines.append(f"   Operations: {', '.join(tool['operations'])}")
+        lines.append(f"   URL: {tool['homepage']}")
+    return "\n".join(lines)
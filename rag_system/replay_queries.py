@@ -0,0 +1,172 @@
+"""
+Replay a captured query log against the current build
+Re-issues the logged queries at their original arrival rate (or scaled by --speed)
+and compares latencies and retrieved tools with the logged run
+
+Usage:
+    RAG_QUERY_LOG=queries.jsonl python demo.py       # capture
+    python replay_queries.py queries.jsonl --speed 4 --retrieval-only
+"""
+
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+import numpy as np
+
+from rag_agent import (QUERY_EXPANSION, embed_query, get_embedding_model, get_llm, get_qdrant_client, run_rag_workflow,
+                       search_vector_db)
+from rag_query_log import hit_ids, read_query_log
+
+
+def run_retrieval_only(user_query: str) -> Dict[str, Any]:
+    """Run only the embedding and search stages (no LLM), returning the workflow state"""
+    state = {
+        "user_query": user_query,
+        # LLM rewrites would call Gemini; keep their synonym variants only
+        "query_expansion": "rules" if QUERY_EXPANSION == "llm" else None,
+        "query_variants": [],
+        "query_embedding": [],
+        "query_embeddings": [],
+        "search_results": [],
+        "formatted_answer": "",
+        "deadline": None,
+        "degraded": False,
+        "timings": {},
+    }
+    return search_vector_db(embed_query(state))
+
+
+def warm_up(retrieval_only: bool):
+    """Load the shared components once, so concurrent first queries don't each load their own"""
+    get_qdrant_client()
+    get_embedding_model().encode(["warm up"])
+    if not retrieval_only:
+        get_llm()
+
+
+def replay_one(entry: Dict[str, Any], retrieval_only: bool, submitted_at: float) -> Dict[str, Any]:
+    """
+    Re-issue one logged query and compare it with the logged outcome
+
+    Latency is measured from submitted_at (time.monotonic() at arrival), so time spent
+    queued behind other in-flight queries counts, as it would for a real user.
+    """
+    queue_s = time.monotonic() - submitted_at
+    try:
+        if retrieval_only:
+            state = run_retrieval_only(entry["query"])
+        else:
+            state = run_rag_workflow(entry["query"], log_query=False)
+    except Exception as e:
+        return {"query": entry["query"], "error": f"{e.__class__.__name__}: {e}"}
+    total_s = time.monotonic() - submitted_at
+
+    original_ids = hit_ids(entry)
+    replay_ids = [tool["biotools_id"] for tool in state["search_results"]]
+    k = max(len(original_ids), 1)
+    return {
+        "query": entry["query"],
+        "original_total_s": entry.get("total_s"),
+        "replay_total_s": round(total_s, 4),
+        "replay_queue_s": round(queue_s, 4),
+        "original_timings": entry.get("timings", {}),
+        "replay_timings": state.get("timings", {}),
+        "overlap": len(set(original_ids) & set(replay_ids)) / k,
+        "same_top1": bool(original_ids and replay_ids and original_ids[0] == replay_ids[0]),
+        "degraded": state.get("degraded", False),
+    }
+
+
+def percentiles(values: List[float]) -> str:
+    if not values:
+        return "n/a"
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return f"p50 {p50 * 1000:.0f}ms  p95 {p95 * 1000:.0f}ms  p99 {p99 * 1000:.0f}ms"
+
+
+def print_summary(results: List[Dict[str, Any]], retrieval_only: bool, wall_s: float):
+    ok = [r for r in results if "error" not in r]
+    print("\n" + "=" * 50)
+    print("📊 REPLAY SUMMARY")
+    print("=" * 50)
+    print(f"Queries: {len(results)} ({len(results) - len(ok)} errors) in {wall_s:.1f}s "
+          f"({len(results) / wall_s if wall_s else 0:.2f} QPS)")
+    if not ok:
+        return
+
+    # In retrieval-only mode only the retrieval stages of the original run are comparable
+    stages = ["embed_query", "search_vector_db"] if retrieval_only else ["embed_query", "search_vector_db", "format_answer"]
+    for stage in stages:
+        original = [r["original_timings"][stage] for r in ok if stage in r["original_timings"]]
+        replay = [r["replay_timings"][stage] for r in ok if stage in r["replay_timings"]]
+        print(f"{stage:<17} original: {percentiles(original)}")
+        print(f"{'':<17} replay:   {percentiles(replay)}")
+    label = "total"
+    if not retrieval_only:
+        print(f"{label:<17} original: {percentiles([r['original_total_s'] for r in ok if r['original_total_s']])}")
+        label = ""
+    print(f"{label:<17} replay:   {percentiles([r['replay_total_s'] for r in ok])} (incl. queueing)")
+    print(f"{'queued':<17} replay:   {percentiles([r['replay_queue_s'] for r in ok])}")
+
+    print(f"Result overlap: mean {np.mean([r['overlap'] for r in ok]):.2f}, "
+          f"same top-1 {np.mean([r['same_top1'] for r in ok]):.0%}")
+    if not retrieval_only:
+        print(f"Degraded answers: {sum(r['degraded'] for r in ok)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a RAG query log and compare latencies and results")
+    parser.add_argument("log", help="query log written with RAG_QUERY_LOG")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="arrival rate multiplier (2 = twice as fast as recorded, 0 = as fast as possible)")
+    parser.add_argument("--limit", type=int, help="replay only the first N queries")
+    parser.add_argument("--retrieval-only", action="store_true",
+                        help="skip the LLM stages (answer and LLM query rewrites)")
+    parser.add_argument("--workers", type=int, default=8, help="max queries in flight")
+    parser.add_argument("--output", help="write per-query comparisons to this JSONL file")
+    args = parser.parse_args()
+
+    # Entries are appended when a query completes; replay them in arrival order
+    entries = sorted(read_query_log(args.log), key=lambda entry: entry["epoch"])[:args.limit]
+    if not entries:
+        print("❌ The query log is empty")
+        return
+    print("🔥 Warming up the shared components...")
+    warm_up(args.retrieval_only)
+    print(f"🔁 Replaying {len(entries)} queries at {args.speed or 'max'}x speed"
+          f"{' (retrieval only)' if args.retrieval_only else ''}...")
+
+    results: List[Dict[str, Any]] = []
+    lock = threading.Lock()
+
+    def collect(future):
+        with lock:
+            results.append(future.result())
+
+    # Open-loop replay: queries are submitted on the recorded schedule, regardless of how long earlier ones take
+    first_epoch = entries[0]["epoch"]
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for entry in entries:
+            if args.speed > 0:
+                delay = (entry["epoch"] - first_epoch) / args.speed - (time.monotonic() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            pool.submit(replay_one, entry, args.retrieval_only, time.monotonic()).add_done_callback(collect)
+    wall_s = time.monotonic() - start
+
+    print_summary(results, args.retrieval_only, wall_s)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(result, ensure_ascii=False, separators=(",", ":")) + "\n")
+        print(f"💾 Per-query comparisons saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
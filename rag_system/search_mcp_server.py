@@ -0,0 +1,151 @@
+"""
+MCP server exposing the bioinformatics semantic search index
+Loads the embedding model and the Qdrant client once and keeps them warm,
+so MCP clients (e.g. the Gemini MCP client) can search without a cold start
+
+Add it to the MCP client config like any other stdio server:
+    "bio-semantic-search": {
+        "command": "python",
+        "args": ["/path/to/rag_system/search_mcp_server.py"]
+    }
+"""
+
+import contextlib
+import sys
+from typing import Any, Dict, List, Optional
+
+from mcp.server.fastmcp import FastMCP
+from qdrant_client.models import FieldCondition, Filter, MatchAny, MatchValue
+
+from rag_agent import COLLECTION_NAME, get_embedding_model, get_qdrant_client
+# qdrant_db/ modules, on sys.path via rag_agent
+from facets import FACET_FIELDS, list_facets
+from tool_search import TOOL_FIELDS, ToolHit, search_tools_batch
+
+# Upper bounds so a single request can't make the server do unbounded work
+MAX_QUERIES_PER_REQUEST = 64
+MAX_LIMIT = 50
+
+mcp = FastMCP("bio-semantic-search")
+
+
+def build_filter(
+    topics: Optional[List[str]] = None,
+    operations: Optional[List[str]] = None,
+    language: Optional[List[str]] = None,
+) -> Optional[Filter]:
+    """Build a Qdrant filter matching tools with any of the given topics / operations / languages"""
+    conditions = [
+        FieldCondition(key=key, match=MatchAny(any=values))
+        for key, values in (("topics", topics), ("operations", operations), ("language", language))
+        if values
+    ]
+    return Filter(must=conditions) if conditions else None
+
+
+@mcp.tool()
+def search_tools(
+    queries: List[str],
+    limit: int = 5,
+    topics: Optional[List[str]] = None,
+    operations: Optional[List[str]] = None,
+    language: Optional[List[str]] = None,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Semantic search for bioinformatics tools.
+
+    Args:
+        queries: One or more natural language queries, searched together in one batch
+        limit: Number of tools to return per query (max 50)
+        topics: Only return tools annotated with any of these EDAM topics
+        operations: Only return tools annotated with any of these EDAM operations
+        language: Only return tools written in any of these programming languages
+
+    Returns:
+        One list of matching tools per query, ordered by relevance
+    """
+    if not queries:
+        return []
+    if len(queries) > MAX_QUERIES_PER_REQUEST:
+        raise ValueError(f"At most {MAX_QUERIES_PER_REQUEST} queries per request are supported")
+    limit = max(1, min(limit, MAX_LIMIT))
+
+    # Encode all queries in a single model call and send a single batched search
+    vectors = get_embedding_model().encode(queries)
+    query_filter = build_filter(topics, operations, language)
+    batch_results = search_tools_batch(get_qdrant_client(), COLLECTION_NAME, vectors.tolist(), limit,
+                                       query_filter=query_filter)
+
+    return [[hit.to_dict() for hit in hits] for hits in batch_results]
+
+
+@mcp.tool()
+def get_tool(biotools_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up a single bioinformatics tool by its bio.tools ID (e.g. "busco").
+
+    Returns:
+        The tool's metadata and description, or None if it is not in the index
+    """
+    points, _ = get_qdrant_client().scroll(
+        collection_name=COLLECTION_NAME,
+        scroll_filter=Filter(must=[FieldCondition(key="biotools_id", match=MatchValue(value=biotools_id))]),
+        limit=1,
+        with_payload=TOOL_FIELDS,
+    )
+    if not points:
+        return None
+    return ToolHit(points[0]).to_dict()
+
+
+@mcp.tool()
+def browse_facets(kind: str = "topic", limit: int = 50) -> List[Dict[str, Any]]:
+    """
+    List EDAM topics or operations with the number of tools annotated with each.
+
+    Args:
+        kind: "topic" or "operation"
+        limit: Number of facets to return, largest first
+
+    Returns:
+        [{"term": ..., "count": ...}, ...]
+    """
+    if kind not in FACET_FIELDS.values():
+        raise ValueError(f"kind must be one of {sorted(FACET_FIELDS.values())}")
+    return list_facets(get_qdrant_client(), COLLECTION_NAME, kind)[:max(1, limit)]
+
+
+@mcp.tool()
+def browse_tools(term: str, kind: str = "topic", limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    List tools annotated with an EDAM topic or operation (e.g. "Proteomics").
+
+    Args:
+        term: EDAM term as returned by browse_facets
+        kind: "topic" or "operation"
+        limit: Number of tools to return (max 50)
+    """
+    field = {facet_kind: field for field, facet_kind in FACET_FIELDS.items()}.get(kind)
+    if field is None:
+        raise ValueError(f"kind must be one of {sorted(FACET_FIELDS.values())}")
+    points, _ = get_qdrant_client().scroll(
+        collection_name=COLLECTION_NAME,
+        scroll_filter=Filter(must=[FieldCondition(key=field, match=MatchValue(value=term))]),
+        limit=max(1, min(limit, MAX_LIMIT)),
+        with_payload=TOOL_FIELDS,
+    )
+    return [ToolHit(point).to_dict() for point in points]
+
+
+def warm_up():
+    """Load the embedding model and connect to Qdrant before serving the first request"""
+    # stdout carries the MCP protocol, so keep the loaders' progress messages on stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        get_qdrant_client()
+        get_embedding_model().encode(["warm up"])
+        print(f"🧬 Semantic search ready on collection '{COLLECTION_NAME}'")
+
+
+if __name__ == "__main__":
+    warm_up()
+    mcp.run()